@@ -0,0 +1,35 @@
+"""
+Shared test helpers
+"""
+
+from typing import Iterable, Optional
+
+from ttc_alerts.models import TTCAlert
+
+
+def make_alert(
+    header: str | int,
+    description: Optional[str] = None,
+    *entities: dict,
+    periods: Iterable[tuple[int, Optional[int]]] = (),
+) -> TTCAlert:
+    """
+    Build a TTCAlert from GTFS-RT JSON the way the fetcher does
+
+    Args:
+        header: Header text, or an alert number for "Route N" / "Detour [00000N]"
+        description: Description text, derived from a numbered header if omitted
+        entities: GTFS-RT informedEntity selectors
+        periods: (start, end) active periods, end None for open-ended
+    """
+    if isinstance(header, int):
+        header, description = f"Route {header}", description or f"Detour [{header:06d}]"
+    return TTCAlert(**{
+        "headerText": {"translation": [{"text": header}]},
+        "descriptionText": {"translation": [{"text": description}]},
+        "informedEntity": list(entities),
+        # MessageToJson renders uint64 timestamps as strings
+        "activePeriod": [
+            {"start": str(start), **({"end": str(end)} if end is not None else {})} for start, end in periods
+        ],
+    })
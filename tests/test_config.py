@@ -0,0 +1,49 @@
+"""
+Tests for configuration loading
+"""
+
+import pytest
+import yaml
+from ttc_alerts.models.config import AppConfig
+
+
+def write_config(tmp_path, data):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(data))
+    return str(path)
+
+
+def test_legacy_telegram_section_is_default_bot(tmp_path):
+    """Test top-level telegram/users still configure a single bot"""
+    config = AppConfig.load(write_config(tmp_path, {
+        "telegram": {"bot_token": "TOKEN"},
+        "users": [{"username": "a", "chat_id": "1"}],
+    }))
+
+    [bot] = config.telegram_bots
+    assert bot.name == "default"
+    assert [user.chat_id for user in bot.users] == ["1"]
+
+
+def test_multiple_bots(tmp_path):
+    """Test bots declare their own subscribers and limits"""
+    config = AppConfig.load(write_config(tmp_path, {
+        "bots": [
+            {"name": "east", "bot_token": "A", "rate_limit": 5, "users": [{"username": "a", "chat_id": "1"}]},
+            {"name": "west", "bot_token": "B", "pool_size": 8, "users": [{"username": "b", "chat_id": "2", "routes": ["501"]}]},
+        ],
+    }))
+
+    east, west = config.telegram_bots
+    assert (east.name, east.rate_limit, east.users[0].chat_id) == ("east", 5, "1")
+    assert (west.pool_size, west.users[0].routes) == (8, ["501"])
+    assert config.users == []
+
+
+def test_duplicate_bot_names_are_rejected(tmp_path):
+    config = AppConfig.load(write_config(tmp_path, {
+        "bots": [{"name": "x", "bot_token": "A"}, {"name": "x", "bot_token": "B"}],
+    }))
+
+    with pytest.raises(ValueError, match="Duplicate channel names"):
+        config.telegram_bots
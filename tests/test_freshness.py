@@ -0,0 +1,50 @@
+"""
+Tests for alert freshness tracking
+"""
+
+import json
+from ttc_alerts.utils.freshness import FreshnessTracker, format_report
+
+
+def test_publish_to_detect_counts_first_sighting_only():
+    """Test an alert contributes one publish->detect sample until it resolves"""
+    tracker = FreshnessTracker()
+    tracker.observe_feed("feed", 100, 103.0, new=["a"])
+    tracker.observe_feed("feed", 110, 115.0, new=["a", "b"])
+    tracker.observe_feed("feed", 120, 121.0, new=[], resolved=["a"])
+
+    stats = tracker.summary()["publish_to_detect"]["feed"]
+
+    assert stats["count"] == 2
+    assert stats["p50"] == 3.0
+    assert stats["p99"] == 5.0
+    assert "a" not in tracker.first_seen
+    assert tracker.first_seen["b"] == 115.0
+
+
+def test_detect_to_deliver_per_shard():
+    """Test delivery lag is reported per shard and overall"""
+    tracker = FreshnessTracker(shards=4)
+    tracker.delivered("1", detected_at=10.0, acked_at=11.0)
+    tracker.delivered("2", detected_at=10.0, acked_at=14.0)
+
+    summary = tracker.summary()["detect_to_deliver"]
+
+    assert summary["all"]["count"] == 2
+    assert summary["all"]["p99"] == 4.0
+    assert summary[tracker.shard_for("1")]["count"] >= 1
+
+
+def test_write_report(tmp_path):
+    """Test the report round-trips through JSON and renders"""
+    tracker = FreshnessTracker()
+    tracker.observe_feed("https://feed", 100, 102.0, new=["a"])
+    tracker.delivered("1", detected_at=102.0, acked_at=102.5)
+    path = tmp_path / "lag.json"
+
+    tracker.write_report(path)
+    text = format_report(json.loads(path.read_text()))
+
+    assert "publish_to_detect" in text
+    assert "https://feed" in text
+    assert "2.00s" in text
@@ -0,0 +1,98 @@
+"""
+Tests for the GTFS static stop index
+"""
+
+import os
+
+import pytest
+from ttc_alerts.models.gtfs_static import StopIndex
+from ttc_alerts.utils.geo import haversine
+
+
+STOPS = """﻿stop_id,stop_name,stop_lat,stop_lon
+union,Union Station,43.6453,-79.3806
+king,King Station,43.6489,-79.3779
+queen,Queen Station,43.6525,-79.3794
+finch,Finch Station,43.7806,-79.4146
+platform,No coordinates,,
+"""
+ROUTES = "route_id,route_short_name\n1,1\n501,501\n97,97\n"
+TRIPS = "route_id,service_id,trip_id\n1,wk,t1\n501,wk,t2\n97,wk,t3\n"
+STOP_TIMES = "trip_id,stop_id,stop_sequence\nt1,union,1\nt1,king,2\nt1,queen,3\nt1,finch,4\nt2,queen,1\nt3,finch,1\n"
+
+
+@pytest.fixture
+def gtfs(tmp_path):
+    for name, content in {
+        "stops.txt": STOPS,
+        "routes.txt": ROUTES,
+        "trips.txt": TRIPS,
+        "stop_times.txt": STOP_TIMES,
+    }.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+    return tmp_path
+
+
+def test_stops_near_matches_brute_force(gtfs):
+    """Test the grid finds exactly the stops within the radius"""
+    index = StopIndex.load(gtfs, cell_size=100)
+
+    assert len(index) == 4
+    for radius in (50, 500, 1000, 20_000):
+        expected = {
+            stop_id for stop_id, lat, lon in zip(index.stop_ids, index.lats, index.lons)
+            if haversine(43.6453, -79.3806, lat, lon) <= radius
+        }
+        assert set(index.stops_near(43.6453, -79.3806, radius)) == expected
+    assert set(index.stops_near(43.6453, -79.3806, 500)) == {"union", "king"}
+    index.close()
+
+
+def test_routes_at_stops(gtfs):
+    """Test stop_times resolve the routes serving each stop"""
+    index = StopIndex.load(gtfs)
+
+    assert index.routes_at(["queen"]) == {"1", "501"}
+    assert index.routes_at(["finch", "unknown"]) == {"1", "97"}
+    index.close()
+
+
+def test_short_stop_times_rows_are_skipped(gtfs):
+    """Test blank and truncated stop_times rows do not stop the build"""
+    (gtfs / "stop_times.txt").write_text(STOP_TIMES + "\nt2\nt3,union,1\n\n", encoding="utf-8")
+    index = StopIndex.load(gtfs)
+
+    assert index.routes_at(["union"]) == {"1", "97"}
+    assert index.routes_at(["queen"]) == {"1", "501"}
+    index.close()
+
+
+def test_cache_is_reused_until_sources_change(gtfs, monkeypatch):
+    """Test the compiled cache is mapped as-is and rebuilt when stale"""
+    StopIndex.load(gtfs).close()
+    assert (gtfs / "stops.cache").exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache was recompiled")
+
+    with monkeypatch.context() as m:
+        m.setattr(StopIndex, "compile", fail)
+        StopIndex.load(gtfs).close()
+
+    stops = gtfs / "stops.txt"
+    stops.write_text(STOPS + "spadina,Spadina Station,43.6672,-79.4037\n", encoding="utf-8")
+    os.utime(stops, ns=(0, 0))
+    index = StopIndex.load(gtfs)
+
+    assert "spadina" in index.stop_ids
+    index.close()
+
+
+def test_corrupt_cache_is_rebuilt(gtfs):
+    """Test an unreadable cache file is replaced"""
+    (gtfs / "stops.cache").write_bytes(b"garbage")
+
+    index = StopIndex.load(gtfs)
+
+    assert len(index) == 4
+    index.close()
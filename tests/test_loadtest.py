@@ -0,0 +1,63 @@
+"""
+Tests for the load test harness
+"""
+
+import pytest
+import requests
+from ttc_alerts.controllers.fetcher import TTCAlertService
+from ttc_alerts.loadtest import ChurnScript, FakeTelegramServer, run_load_test
+from ttc_alerts.loadtest.harness import expected_events
+
+
+def test_churn_script_keeps_active_size():
+    """Test that every tick replaces exactly `churn` alerts"""
+    script = ChurnScript(active=10, churn=3, seed=1)
+    first = set(script.advance())
+    second = set(script.advance())
+
+    assert len(first) == len(second) == 10
+    assert len(first - second) == 3
+    assert len(second - first) == 3
+
+
+def test_expected_events():
+    """Test expected notifications are the diff of consecutive snapshots"""
+    events = expected_events([[1, 2], [2, 3]])
+
+    assert events == {("new", 1), ("new", 2), ("new", 3), ("resolved", 1)}
+
+
+def test_fake_telegram_injects_rate_limits():
+    """Test the Telegram stand-in answers with 429 when asked to"""
+    server = FakeTelegramServer(rate_limit_ratio=1.0).start()
+    try:
+        response = requests.post(f"{server.url}/botTOKEN/sendMessage", json={"chat_id": "1", "text": "x"})
+    finally:
+        server.stop()
+
+    assert response.status_code == 429
+    assert response.json()["parameters"]["retry_after"] == 1
+    assert server.rate_limited == 1
+    assert server.receipts == []
+
+
+@pytest.mark.parametrize("users", [1, 3])
+def test_run_load_test_delivers_everything(users):
+    """Test a fault-free run delivers every expected notification exactly once"""
+    result = run_load_test(users=users, cycles=3, interval=0.05, script=ChurnScript(active=5, churn=2))
+
+    assert result.expected == users * (5 + 2 + 2 + 2 + 2)
+    assert result.dropped == 0
+    assert result.duplicates == 0
+    assert result.deliveries == result.expected
+    assert "deliver" in result.stages
+
+
+def test_run_load_test_restores_service_state():
+    """Test a run leaves TTCAlertService pointing where it did before"""
+    alerts_url, notifiers = TTCAlertService.alerts_url, TTCAlertService._notifiers
+
+    run_load_test(users=1, cycles=1, interval=0.01, script=ChurnScript(active=2, churn=1))
+
+    assert TTCAlertService.alerts_url == alerts_url
+    assert TTCAlertService._notifiers is notifiers
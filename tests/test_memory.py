@@ -0,0 +1,135 @@
+"""
+Tests for bounded caches and memory instrumentation
+"""
+
+import asyncio
+import threading
+import time
+import tracemalloc
+
+import pytest
+from ttc_alerts.controllers.fetcher import TTCAlertService
+from ttc_alerts.controllers.notifier import Notifier
+from ttc_alerts.controllers.pipeline import MonitorPipeline
+from ttc_alerts.models import SubscriptionIndex
+from ttc_alerts.models.config import User
+from ttc_alerts.utils.cache import LRUCache
+from ttc_alerts.utils.freshness import FreshnessTracker
+from ttc_alerts.utils.memory import MemoryMonitor
+from ttc_alerts.utils.metrics import StageMetrics
+
+from tests.helpers import make_alert
+
+
+def test_lru_cache_is_capped():
+    """Test the cache evicts least recently used entries"""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_lru_cache_rejects_empty_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+
+
+def test_memory_monitor_top_stats():
+    """Test the monitor reports allocation sites"""
+    monitor = MemoryMonitor(interval=0, top=3)
+    monitor.start(dump_signal=None)
+    try:
+        blob = [bytearray(1024) for _ in range(100)]
+        stats = monitor.top_stats()
+    finally:
+        monitor.stop()
+
+    assert blob
+    assert 0 < len(stats) <= 3
+
+
+class CountingNotifier(Notifier):
+    """Notifier that only counts messages, so the test itself keeps nothing"""
+
+    name = "stub"
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, message, recipient):
+        self.sent += 1
+        return True
+
+
+class TracedMemory:
+    """Memory monitor stand-in sampling traced memory once per diffed feed"""
+
+    def __init__(self, warmup):
+        self.warmup = warmup
+        self.cycles = 0
+        self.baseline = self.current = 0
+
+    def tick(self):
+        self.cycles += 1
+        self.current, _ = tracemalloc.get_traced_memory()
+        if self.cycles == self.warmup:
+            self.baseline = self.current
+
+
+class RollingService:
+    """
+    Service whose feed retires two alerts and publishes two new ones per poll
+
+    A poll waits until the previous feed was parsed, so no feed is skipped
+    and every cycle goes through the diff, routing and delivery stages.
+    """
+
+    alerts_url = "stub"
+    config = None
+    compare_alerts = staticmethod(TTCAlertService.compare_alerts)
+    _profiler = None
+
+    def __init__(self, users, warmup):
+        self.polls = 0
+        self._parsed = threading.Semaphore()
+        self.metrics = StageMetrics(max_samples=100)
+        self.freshness = FreshnessTracker(shards=2, max_samples=100)
+        self._subscriptions = {"stub": SubscriptionIndex(users)}
+        self._notifiers = {"stub": CountingNotifier()}
+        self._memory_monitor = TracedMemory(warmup)
+
+    def fetch_feed(self):
+        self._parsed.acquire()
+        self.polls += 1
+        return str(self.polls).encode()
+
+    def feed_digest(self, data):
+        return data.decode()
+
+    def parse_feed(self, data):
+        self._parsed.release()
+        first = 2 * int(data)
+        return int(time.time()), [make_alert(i, None, {"routeId": str(i % 50)}) for i in range(first, first + 20)]
+
+
+def test_soak_memory_stays_flat():
+    """Test thousands of monitor cycles do not grow traced memory after a warm-up"""
+    users = [User(username=f"user{i}", chat_id=str(i), routes=[str(i % 50)]) for i in range(100)]
+    service = RollingService(users + [User(username="all", chat_id="all")], warmup=500)
+    pipeline = MonitorPipeline(service, interval=0, max_cycles=2000)
+
+    tracemalloc.start()
+    try:
+        asyncio.run(pipeline.run())
+    finally:
+        tracemalloc.stop()
+
+    monitor = service._memory_monitor
+    assert monitor.cycles == 2000
+    assert service._notifiers["stub"].sent > 0
+    assert monitor.current - monitor.baseline < 256 * 1024
@@ -0,0 +1,66 @@
+"""
+Tests for the e-mail and webhook notifiers
+"""
+
+from ttc_alerts.controllers.smtp import SmtpNotifier
+from ttc_alerts.controllers.webhook import WebhookNotifier
+from ttc_alerts.loadtest import FakeSMTPServer, FakeWebhookServer
+from ttc_alerts.models.config import SmtpConfig, WebhookConfig
+from ttc_alerts.models.telegram import TelegramMessage
+
+
+def test_smtp_reuses_one_authenticated_connection():
+    """Test many e-mails are sent over a single login"""
+    server = FakeSMTPServer().start()
+    try:
+        notifier = SmtpNotifier(SmtpConfig(
+            host=server.host,
+            port=server.port,
+            sender="alerts@example.com",
+            username="user",
+            password="secret",
+            starttls=False,
+        ))
+        deliveries = [(f"rider{i}@example.com", TelegramMessage(text=f"<b>New alert</b>\nALERT-{i:06d}")) for i in range(5)]
+        results = notifier.send_batch(deliveries) + [notifier.send_message(*reversed(deliveries[0]))]
+        notifier.close()
+    finally:
+        server.stop()
+
+    assert all(results)
+    assert server.connections == 1
+    assert server.logins == 1
+    assert len(server.messages) == 6
+    assert server.messages[0]["Subject"] == "New alert"
+    assert server.messages[0]["To"] == "rider0@example.com"
+
+
+def test_smtp_reconnects_after_421():
+    """Test a session closed with 421 is re-established without losing mail"""
+    server = FakeSMTPServer(drop_after=2).start()
+    try:
+        notifier = SmtpNotifier(SmtpConfig(host=server.host, port=server.port, sender="alerts@example.com", starttls=False))
+        results = notifier.send_batch([(f"rider{i}@example.com", TelegramMessage(text=f"ALERT-{i:06d}")) for i in range(4)])
+        notifier.close()
+    finally:
+        server.stop()
+
+    assert results == [True] * 4
+    assert len(server.messages) == 4
+    assert server.connections == notifier.connects == 2
+
+
+def test_webhook_batches_over_keep_alive_connection():
+    """Test messages are posted in batch_size chunks over one connection"""
+    server = FakeWebhookServer().start()
+    try:
+        notifier = WebhookNotifier(WebhookConfig(url=server.url, batch_size=2))
+        results = notifier.send_batch([(str(i), TelegramMessage(text=f"ALERT-{i:06d}")) for i in range(5)])
+        notifier.close()
+    finally:
+        server.stop()
+
+    assert results == [True] * 5
+    assert [len(batch) for batch in server.batches] == [2, 2, 1]
+    assert server.connections == 1
+    assert server.messages[4] == {"recipient": "4", "text": "ALERT-000004", "parse_mode": "HTML"}
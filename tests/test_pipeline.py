@@ -0,0 +1,238 @@
+"""
+Tests for the asyncio monitor pipeline
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from ttc_alerts.controllers.fetcher import TTCAlertService
+from ttc_alerts.controllers.notifier import Notifier
+from ttc_alerts.controllers.pipeline import MonitorPipeline
+from ttc_alerts.models import SubscriptionIndex
+from ttc_alerts.models.config import AppConfig, SnapshotConfig, User
+from ttc_alerts.models.snapshot import MonitorSnapshot
+from ttc_alerts.utils.freshness import FreshnessTracker
+from ttc_alerts.utils.metrics import StageMetrics
+
+from tests.helpers import make_alert
+
+
+class SlowController(Notifier):
+    """Notifier taking `delay` seconds per message"""
+
+    def __init__(self, delay, name="stub"):
+        self.name = name
+        self.delay = delay
+        self.sent = []
+
+    def send_message(self, message, chat_id):
+        time.sleep(self.delay)
+        self.sent.append((chat_id, message.text))
+        return True
+
+
+class StubService:
+    """Service whose feed publishes one new alert per poll"""
+
+    alerts_url = "stub"
+    config = None
+    metrics = StageMetrics()
+    compare_alerts = staticmethod(TTCAlertService.compare_alerts)
+    _memory_monitor = None
+    _profiler = None
+
+    def __init__(self, users, delay, bots=("stub",)):
+        self.polled_at = []
+        self._subscriptions = {bot: SubscriptionIndex(users) for bot in bots}
+        self._notifiers = {bot: SlowController(delay, bot) for bot in bots}
+        self.sent = self._notifiers[bots[0]].sent
+        self.freshness = FreshnessTracker(shards=2)
+
+    def fetch_feed(self):
+        self.polled_at.append(time.monotonic())
+        return str(len(self.polled_at)).encode()
+
+    def feed_digest(self, data):
+        return data.decode()
+
+    def parse_feed(self, data):
+        return int(time.time()), [make_alert(i) for i in range(1, int(data) + 1)]
+
+
+def test_polling_keeps_schedule_while_delivery_lags():
+    """Test slow delivery neither delays polls nor loses queued messages"""
+    users = [User(username=f"user{i}", chat_id=str(i)) for i in range(5)]
+    service = StubService(users, delay=0.05)
+    pipeline = MonitorPipeline(service, interval=0.05, max_cycles=5, workers=1, queue_size=2)
+
+    asyncio.run(pipeline.run())
+
+    gaps = [b - a for a, b in zip(service.polled_at, service.polled_at[1:])]
+    assert len(service.polled_at) == 5
+    assert max(gaps) < 0.15
+    # 5 users x 5 cycles, each with one new alert, all drained before run() returns
+    assert len(service.sent) == 25
+    assert service.freshness.summary()["detect_to_deliver"]["all"]["count"] == 25
+
+
+def test_stale_feed_snapshot_is_replaced():
+    """Test the poller overwrites a snapshot the diff stage has not consumed"""
+
+    async def scenario():
+        pipeline = MonitorPipeline(StubService([], delay=0), interval=1)
+        pipeline._feeds = asyncio.Queue(maxsize=1)
+        pipeline._put_latest(b"1")
+        pipeline._put_latest(b"2")
+        return pipeline, await pipeline._feeds.get()
+
+    pipeline, data = asyncio.run(scenario())
+
+    assert data == b"2"
+    assert pipeline.skipped_feeds == 1
+
+
+def test_warm_restart_does_not_renotify(tmp_path):
+    """Test a restarted monitor diffs against its snapshot instead of nothing"""
+    users = [User(username="user", chat_id="1")]
+    config = AppConfig(users=users, snapshot=SnapshotConfig(path=str(tmp_path / "snapshot.json")))
+
+    first = StubService(users, delay=0)
+    first.config = config
+    first.fetch_feed = lambda: b"3"
+    asyncio.run(MonitorPipeline(first, interval=0, max_cycles=1).run())
+
+    second = StubService(users, delay=0)
+    second.config = config
+    second.fetch_feed = lambda: b"4"
+    asyncio.run(MonitorPipeline(second, interval=0, max_cycles=2).run())
+
+    assert len(first.sent) == 1
+    # Only alert 4 is new after the restart; the second poll is an unchanged feed
+    assert len(second.sent) == 1
+    assert "Route 4" in second.sent[0][1]
+    assert "Route 1" not in second.sent[0][1]
+
+
+def test_snapshot_waits_for_routing(tmp_path):
+    """Test alerts are saved as seen only once their changes are routed"""
+    users = [User(username="user", chat_id="1")]
+    path = tmp_path / "snapshot.json"
+    service = StubService(users, delay=0)
+    service.config = AppConfig(users=users, snapshot=SnapshotConfig(path=str(path), interval=0))
+    index = service._subscriptions["stub"]
+    route = index.route
+    saved = []
+
+    def routing(alerts):
+        snapshot = MonitorSnapshot.load(path)
+        saved.append(len(snapshot.alerts) if snapshot else 0)
+        return route(alerts)
+
+    index.route = routing
+    asyncio.run(MonitorPipeline(service, interval=0, max_cycles=3).run())
+
+    assert saved == [0, 1, 2]
+    assert len(MonitorSnapshot.load(path).alerts) == 3
+    assert len(service.sent) == 3
+
+
+def test_bots_share_one_fetch_and_diff():
+    """Test every bot gets its own deliveries from a single poll per cycle"""
+    users = [User(username="user", chat_id="1")]
+    service = StubService(users, delay=0, bots=("fast", "slow"))
+    service._notifiers["slow"].delay = 0.05
+
+    asyncio.run(MonitorPipeline(service, interval=0.01, max_cycles=3).run())
+
+    assert len(service.polled_at) == 3
+    assert len(service._notifiers["fast"].sent) == 3
+    assert len(service._notifiers["slow"].sent) == 3
+    shards = service.freshness.summary()["detect_to_deliver"]
+    assert any(key.startswith("fast/") for key in shards)
+    assert any(key.startswith("slow/") for key in shards)
+
+
+def test_quiet_hours_hold_back_deliveries():
+    """Test users in quiet hours get nothing until their window opens"""
+    now = datetime.now()
+    quiet_hours = f"{now - timedelta(hours=1):%H:%M}-{now + timedelta(hours=1):%H:%M}"
+    users = [User(username="awake", chat_id="1"), User(username="asleep", chat_id="2", quiet_hours=quiet_hours)]
+    service = StubService(users, delay=0)
+    pipeline = MonitorPipeline(service, interval=0.01, max_cycles=2)
+
+    asyncio.run(pipeline.run())
+
+    assert [chat_id for chat_id, _ in service.sent] == ["1", "1"]
+    assert len(pipeline._schedulers["stub"]) == 2
+
+
+def test_expired_alert_is_never_announced_or_resolved():
+    """Test an alert that ended before it was seen gets no notice at all"""
+    users = [User(username="user", chat_id="1")]
+    service = StubService(users, delay=0)
+    expired = make_alert("Line 1", "Ended", periods=[(1, 2)])
+    feeds = iter([b"1", b"2"])
+    service.fetch_feed = lambda: next(feeds)
+    service.parse_feed = lambda data: (int(time.time()), [make_alert(2)] + ([expired] if data == b"1" else []))
+    pipeline = MonitorPipeline(service, interval=0, max_cycles=2)
+
+    asyncio.run(pipeline.run())
+
+    assert len(service.sent) == 1
+    assert "Route 2" in service.sent[0][1]
+    assert expired not in pipeline.current_alerts
+
+
+def test_failing_notifier_does_not_stop_delivery():
+    """Test a notifier raising only fails its own batch"""
+    users = [User(username="user", chat_id="1")]
+    service = StubService(users, delay=0)
+    notifier = service._notifiers["stub"]
+    send_message = notifier.send_message
+    calls = []
+
+    def flaky(message, chat_id):
+        calls.append(chat_id)
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return send_message(message, chat_id)
+
+    notifier.send_message = flaky
+    asyncio.run(MonitorPipeline(service, interval=0.01, max_cycles=3).run())
+
+    assert len(calls) == 3
+    assert len(service.sent) == 2
+    assert service.freshness.summary()["detect_to_deliver"]["all"]["count"] == 2
+
+
+def test_deferred_changes_survive_restart(tmp_path):
+    """Test quiet hours deferrals are delivered after a restart"""
+    now = datetime.now()
+    quiet_hours = f"{now - timedelta(hours=1):%H:%M}-{now + timedelta(hours=1):%H:%M}"
+    users = [User(username="asleep", chat_id="2", quiet_hours=quiet_hours)]
+    path = tmp_path / "snapshot.json"
+    config = AppConfig(users=users, snapshot=SnapshotConfig(path=str(path)))
+
+    def run(feed):
+        service = StubService(users, delay=0)
+        service.config = config
+        service.fetch_feed = lambda: feed
+        pipeline = MonitorPipeline(service, interval=0, max_cycles=1)
+        asyncio.run(pipeline.run())
+        return service, pipeline
+
+    first, _ = run(b"2")
+    second, pipeline = run(b"2")
+
+    assert first.sent == second.sent == []
+    assert len(pipeline._schedulers["stub"]) == 2
+
+    # Open the window: the restored bucket falls due on the next start
+    snapshot = MonitorSnapshot.load(path)
+    snapshot.deferred["stub"][0].due = 0
+    snapshot.save(path)
+    third, _ = run(b"2")
+
+    assert len(third.sent) == 1
+    assert "Route 1" in third.sent[0][1] and "Route 2" in third.sent[0][1]
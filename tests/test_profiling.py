@@ -0,0 +1,31 @@
+"""
+Tests for per-cycle profiling
+"""
+
+import pstats
+import time
+from ttc_alerts.utils.profiling import CycleProfiler
+
+
+def test_every_nth_cycle_is_dumped(tmp_path):
+    """Test sampling dumps only every Nth cycle of a name"""
+    profiler = CycleProfiler(tmp_path, every=2)
+    for _ in range(5):
+        with profiler.cycle("diff"):
+            sum(range(1000))
+
+    assert len(profiler.dumps) == 2
+    assert all(path.name.startswith("diff-") for path in profiler.dumps)
+    assert pstats.Stats(str(profiler.dumps[0])).total_calls > 0
+
+
+def test_slow_cycles_are_dumped(tmp_path):
+    """Test only cycles over the threshold are dumped"""
+    profiler = CycleProfiler(tmp_path, slow=0.05)
+    with profiler.cycle():
+        pass
+    with profiler.cycle():
+        time.sleep(0.06)
+
+    assert len(profiler.dumps) == 1
+    assert "-000002-" in profiler.dumps[0].name
@@ -0,0 +1,105 @@
+"""
+Tests for quiet hours and deferred delivery
+"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from ttc_alerts.controllers.scheduler import DeliveryScheduler
+from ttc_alerts.models.config import QuietHours, User
+
+from tests.helpers import make_alert
+
+
+TORONTO = "America/Toronto"
+
+
+def at(text):
+    """POSIX time of a Toronto wall clock time"""
+    return datetime.fromisoformat(text).replace(tzinfo=ZoneInfo(TORONTO)).timestamp()
+
+
+@pytest.fixture
+def sleeper():
+    return User(username="sleeper", chat_id="1", quiet_hours="22:00-07:00", timezone=TORONTO)
+
+
+def test_quiet_hours_window_end():
+    """Test windows spanning midnight and same-day windows"""
+    night = QuietHours.parse("22:00-07:00", TORONTO)
+    nap = QuietHours.parse("13:00-14:30", TORONTO)
+
+    assert night.window_end(at("2026-03-02T23:30")) == at("2026-03-03T07:00")
+    assert night.window_end(at("2026-03-03T03:00")) == at("2026-03-03T07:00")
+    assert night.window_end(at("2026-03-03T07:00")) is None
+    assert nap.window_end(at("2026-03-03T13:15")) == at("2026-03-03T14:30")
+    assert nap.window_end(at("2026-03-03T15:00")) is None
+    with pytest.raises(ValueError):
+        QuietHours.parse("10pm-7am")
+    with pytest.raises(ValueError):
+        User(username="u", chat_id="1", quiet_hours="22:00-07:00", timezone="Mars/Olympus")
+
+
+def test_active_period():
+    """Test active_period parsing from GTFS-RT JSON"""
+    alert = make_alert(1, periods=[(1000, 2000), (3000, None)])
+
+    assert alert.starts_at(500) == 1000
+    assert alert.starts_at(1500) is None
+    assert alert.starts_at(2500) == 3000
+    assert not alert.is_expired(5000)
+    assert make_alert(2, periods=[(1000, 2000)]).is_expired(2000)
+    assert not make_alert(3).is_expired(2000)
+
+
+def test_quiet_hours_collapse_into_one_summary(sleeper):
+    """Test changes during quiet hours are delivered together when the window opens"""
+    scheduler = DeliveryScheduler()
+    first, second, third = make_alert(1), make_alert(2), make_alert(3)
+
+    assert scheduler.submit(sleeper, {"new": [first, second]}, 0, at("2026-03-02T23:00")) == {"resolved": [], "new": []}
+    assert scheduler.submit(sleeper, {"new": [third]}, 0, at("2026-03-03T02:00")) == {"resolved": [], "new": []}
+
+    assert scheduler.next_due() == at("2026-03-03T07:00")
+    assert scheduler.pop_due(at("2026-03-03T06:59")) == []
+    [summary] = scheduler.pop_due(at("2026-03-03T07:00"))
+    assert list(summary.new) == [first, second, third]
+    assert len(scheduler) == 0
+
+
+def test_resolved_before_delivery_is_dropped(sleeper):
+    """Test an alert resolved while deferred is never sent"""
+    scheduler = DeliveryScheduler()
+    short, long = make_alert(1), make_alert(2)
+    awake = User(username="awake", chat_id="2")
+
+    scheduler.submit(sleeper, {"new": [short, long]}, 0, at("2026-03-02T23:00"))
+    immediate = scheduler.submit(sleeper, {"resolved": [short]}, 0, at("2026-03-03T01:00"))
+
+    assert immediate == {"resolved": [], "new": []}
+    assert scheduler.submit(awake, {"resolved": [short]}, 0, at("2026-03-03T01:00")) == {"resolved": [short], "new": []}
+    [summary] = scheduler.pop_due(at("2026-03-03T07:00"))
+    assert list(summary.new) == [long]
+    assert not summary.resolved
+
+
+def test_alerts_wait_for_their_active_period(sleeper):
+    """Test not yet active alerts are deferred to their start, then past quiet hours"""
+    scheduler = DeliveryScheduler()
+    awake = User(username="awake", chat_id="2")
+    now = at("2026-03-02T12:00")
+    evening, night = make_alert(1), make_alert(2)
+    starts = {evening: at("2026-03-02T18:00"), night: at("2026-03-02T23:00")}
+
+    scheduler.submit(awake, {"new": [evening, night]}, now, now, starts)
+    scheduler.submit(sleeper, {"new": [evening, night]}, now, now, starts)
+
+    assert [(p.chat_id, list(p.new)) for p in scheduler.pop_due(at("2026-03-02T18:00"))] == [
+        ("2", [evening]),
+        ("1", [evening]),
+    ]
+    assert [(p.chat_id, list(p.new)) for p in scheduler.pop_due(at("2026-03-03T07:00"))] == [
+        ("2", [night]),
+        ("1", [night]),
+    ]
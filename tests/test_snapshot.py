@@ -0,0 +1,55 @@
+"""
+Tests for monitor snapshots
+"""
+
+import json
+from ttc_alerts.models.pending import PendingNotification
+from ttc_alerts.models.snapshot import MonitorSnapshot
+
+from tests.helpers import make_alert
+
+
+def test_round_trip_keeps_normalized_alerts(tmp_path):
+    """Test restored alerts equal the originals and are not normalized twice"""
+    alerts = [make_alert("5 Avenue: detour", "5 Avenue: detour: via Bay", {"routeId": "5"}), make_alert("Line 1", "Delays")]
+    path = tmp_path / "snapshot.json"
+
+    MonitorSnapshot(alerts=alerts, feed_digest="abc").save(path)
+    snapshot = MonitorSnapshot.load(path)
+
+    assert snapshot.alerts == alerts
+    assert [a.description for a in snapshot.alerts] == [a.description for a in alerts]
+    assert snapshot.alerts[0].route_ids == {"5"}
+    assert snapshot.feed_digest == "abc"
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_missing_stale_and_corrupt_snapshots(tmp_path):
+    """Test unusable snapshots are ignored"""
+    path = tmp_path / "snapshot.json"
+    assert MonitorSnapshot.load(path) is None
+
+    MonitorSnapshot(alerts=[make_alert("Line 1", "Delays")]).save(path)
+    assert MonitorSnapshot.load(path, max_age=-1) is None
+
+    data = json.loads(path.read_text())
+    data["alerts"][0]["id"] = "0" * 16
+    path.write_text(json.dumps(data))
+    assert MonitorSnapshot.load(path) is None
+
+    path.write_text("{not json")
+    assert MonitorSnapshot.load(path) is None
+
+
+def test_deferred_notifications_round_trip(tmp_path):
+    """Test deferred changes are saved per channel and restored"""
+    new, resolved = make_alert("Line 1", "Delays"), make_alert("Line 2", "Shuttle buses")
+    pending = PendingNotification("1", due=1000.0, detected_at=10.0, new={new: None}, resolved={resolved: None})
+    path = tmp_path / "snapshot.json"
+
+    MonitorSnapshot(alerts=[new], deferred={"bot": [pending]}).save(path)
+    snapshot = MonitorSnapshot.load(path)
+
+    assert snapshot.deferred == {"bot": [pending]}
+    assert snapshot.deferred["bot"][0].new[new] is None
+
@@ -0,0 +1,106 @@
+"""
+Tests for the subscription index
+"""
+
+import pytest
+from google.transit import gtfs_realtime_pb2
+from ttc_alerts.controllers.fetcher import TTCAlertService
+from ttc_alerts.models import StopIndex, SubscriptionIndex
+from ttc_alerts.models.config import User
+
+from tests.helpers import make_alert
+
+
+@pytest.fixture
+def alerts():
+    return {
+        "resolved": [make_alert("501 Queen", "Detour", {"routeId": "501", "stopId": "1234"})],
+        "new": [
+            make_alert("Line 1", "No service", {"routeId": "1", "routeType": 1}),
+            make_alert("5 Avenue Rd", "Stop closed", {"stopId": "5555"}),
+        ],
+    }
+
+
+def test_alert_keeps_informed_entities(alerts):
+    """Test informed_entity survives parsing"""
+    alert = alerts["resolved"][0]
+
+    assert alert.route_ids == {"501"}
+    assert alert.stop_ids == {"1234"}
+    assert alert.informed_entity[0].agency_id is None
+
+
+def test_route_subscription_is_exact(alerts):
+    """Test route "5" does not match route "501" or stop "5555\""""
+    index = SubscriptionIndex([User(username="a", chat_id="1", routes=["5"])])
+
+    assert index.route(alerts) == {}
+
+
+def test_structured_subscriptions(alerts):
+    """Test route and stop subscriptions"""
+    index = SubscriptionIndex([
+        User(username="a", chat_id="1", routes=[501]),
+        User(username="b", chat_id="2", stops=["5555"], routes=["1"]),
+    ])
+
+    routed = index.route(alerts)
+
+    assert routed["1"] == {"resolved": alerts["resolved"], "new": []}
+    assert routed["2"] == {"resolved": [], "new": alerts["new"]}
+
+
+def test_substring_and_unfiltered_users(alerts):
+    """Test legacy substring filters and users without filters"""
+    index = SubscriptionIndex([
+        User(username="a", chat_id="1", filters=["Line", "No service"]),
+        User(username="b", chat_id="2"),
+    ])
+
+    routed = index.route(alerts)
+
+    assert routed["1"] == {"resolved": [], "new": [alerts["new"][0]]}
+    assert routed["2"] == {"resolved": alerts["resolved"], "new": alerts["new"]}
+
+
+def test_proximity_subscriptions(tmp_path):
+    """Test users near a coordinate get alerts for nearby stops and their routes"""
+    (tmp_path / "stops.txt").write_text(
+        "stop_id,stop_lat,stop_lon\nunion,43.6453,-79.3806\nfinch,43.7806,-79.4146\n"
+    )
+    (tmp_path / "trips.txt").write_text("route_id,trip_id\n1,t1\n97,t2\n")
+    (tmp_path / "stop_times.txt").write_text("trip_id,stop_id\nt1,union\nt1,finch\nt2,finch\n")
+    stops = StopIndex.load(tmp_path)
+    index = SubscriptionIndex(
+        [User(username="a", chat_id="1", near=[{"lat": 43.6460, "lon": -79.3800, "radius": 300}])],
+        stops,
+    )
+
+    union = make_alert("Union", "Elevator out", {"stopId": "union"})
+    line_1 = make_alert("Line 1", "Delays", {"routeId": "1"})
+    finch = make_alert("Finch", "Elevator out", {"routeId": "1", "stopId": "finch"})
+    route_97 = make_alert("97 Yonge", "Detour", {"routeId": "97"})
+
+    assert index.route({"new": [union, line_1, finch, route_97]}) == {"1": {"resolved": [], "new": [union, line_1]}}
+    stops.close()
+
+
+def test_deduplicated_alerts_keep_every_informed_entity():
+    """Test alerts sharing a description still reach every route's subscribers"""
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    for route_id in ("501", "301"):
+        alert = feed.entity.add(id=route_id).alert
+        alert.header_text.translation.add(text="Queen St")
+        alert.description_text.translation.add(text="Diversion due to a collision")
+        alert.informed_entity.add(route_id=route_id)
+        alert.active_period.add(start=1000, end=2000)
+
+    _, alerts = TTCAlertService.parse_feed(feed.SerializeToString())
+    index = SubscriptionIndex([User(username="a", chat_id="1", routes=["301"])])
+
+    assert len(alerts) == 1
+    assert alerts[0].route_ids == {"501", "301"}
+    assert len(alerts[0].active_period) == 1
+    assert index.route({"new": alerts}) == {"1": {"resolved": [], "new": alerts}}
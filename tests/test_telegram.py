@@ -0,0 +1,35 @@
+"""
+Tests for the Telegram controller
+"""
+
+from ttc_alerts.controllers.telegram import TelegramController
+from ttc_alerts.loadtest import FakeTelegramServer
+from ttc_alerts.models.config import TelegramConfig
+from ttc_alerts.models.telegram import TelegramMessage
+
+
+def test_send_message_retries_rate_limited_requests():
+    """Test 429 answers are retried up to max_retries times"""
+    server = FakeTelegramServer(rate_limit_ratio=1.0, retry_after=0).start()
+    try:
+        controller = TelegramController(TelegramConfig(bot_token="TOKEN", api_url=server.url, max_retries=2))
+        sent = controller.send_message(TelegramMessage(text="ALERT-000001"), "1")
+    finally:
+        server.stop()
+
+    assert not sent
+    assert server.rate_limited == 3
+
+
+def test_send_message_reuses_connections():
+    """Test messages are delivered over the controller's pooled session"""
+    server = FakeTelegramServer().start()
+    try:
+        controller = TelegramController(TelegramConfig(bot_token="TOKEN", api_url=server.url, rate_limit=1000))
+        results = [controller.send_message(TelegramMessage(text=f"ALERT-{i:06d}"), "1") for i in range(3)]
+    finally:
+        server.stop()
+
+    assert all(results)
+    assert [receipt.alert_id for receipt in server.receipts] == [0, 1, 2]
+    assert server.connections == 1
@@ -2,9 +2,11 @@
 TTC Alerts Fetcher module
 """
 
+import asyncio
+import hashlib
+from contextlib import nullcontext
 import requests
 from datetime import datetime
-import time
 import json
 from google.protobuf.json_format import MessageToJson
 from google.transit import gtfs_realtime_pb2
@@ -12,9 +14,19 @@ from typing import Optional
 
 from ..models.alert import TTCAlert
 from ..models import filter_duplicates
-from ..models.config import AppConfig
+from ..models.gtfs_static import StopIndex
+from ..models.subscription import SubscriptionIndex
+from ..models.config import AppConfig, ChannelConfig, SmtpConfig, TelegramConfig, WebhookConfig
+from ..controllers.pipeline import MonitorPipeline
+from ..controllers.notifier import Notifier
+from ..controllers.smtp import SmtpNotifier
 from ..controllers.telegram import TelegramController
+from ..controllers.webhook import WebhookNotifier
 from ..utils.logging import setup_logging
+from ..utils.freshness import FreshnessTracker
+from ..utils.memory import MemoryMonitor
+from ..utils.metrics import StageMetrics
+from ..utils.profiling import CycleProfiler
 
 
 logger = setup_logging(__name__)
@@ -41,122 +53,174 @@ class TTCAlertService:
     })
 
     config: Optional[AppConfig] = None
+    metrics: StageMetrics = StageMetrics()
+    freshness: FreshnessTracker = FreshnessTracker()
 
-    _telegram_controller: Optional[TelegramController] = None
+    _notifiers: dict[str, Notifier] = {}
+    _subscriptions: dict[str, SubscriptionIndex] = {}
+    _stops: Optional[StopIndex] = None
+    _memory_monitor: Optional[MemoryMonitor] = None
+    _profiler: Optional[CycleProfiler] = None
 
     @classmethod
     def setup_config(cls, config: AppConfig) -> None:
         """Setup config"""
 
         cls.config = config
+        cls.setup_stops(config)
+        cls._subscriptions = {
+            channel.name: SubscriptionIndex(channel.users, cls._stops) for channel in config.channels
+        }
+        cls.freshness = FreshnessTracker(shards=config.freshness.shards)
 
+    @classmethod
+    def setup_stops(cls, config: AppConfig) -> None:
+        """Load the GTFS static stop index used by proximity subscriptions"""
+
+        if cls._stops is not None:
+            cls._stops.close()
+            cls._stops = None
+        static = config.gtfs_static
+        if not static.path:
+            return
+        try:
+            cls._stops = StopIndex.load(static.path, static.cache_path, static.cell_size)
+            logger.info(f"Loaded {len(cls._stops)} GTFS static stops from {static.path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load GTFS static feed {static.path}: {e}")
+
+    @staticmethod
+    def create_notifier(channel: ChannelConfig) -> Notifier:
+        """Create the notifier for a channel configuration"""
+        if isinstance(channel, TelegramConfig):
+            return TelegramController(channel)
+        if isinstance(channel, SmtpConfig):
+            return SmtpNotifier(channel)
+        if isinstance(channel, WebhookConfig):
+            return WebhookNotifier(channel)
+        raise TypeError(f"Unknown notification channel: {channel!r}")
 
     @classmethod
-    def setup_telegram(cls, config: AppConfig) -> None:
-        """Setup Telegram notifications"""
-        if config.telegram:
-            cls._telegram_controller = TelegramController(config.telegram)
-            logger.info("Telegram notifications enabled")
+    def setup_notifiers(cls, config: AppConfig) -> None:
+        """Setup notification channels: Telegram bots, e-mail and webhooks"""
+        cls._notifiers = {channel.name: cls.create_notifier(channel) for channel in config.channels}
+        for channel in config.channels:
+            logger.info(f"{type(channel).__name__.removesuffix('Config')} notifications enabled"
+                        f" for {channel.name} ({len(channel.users)} users)")
 
     @classmethod
-    def get_alerts(cls) -> list[TTCAlert]:
-        """Fetch and parse GTFS-RT alerts data, returning a list of TTCAlert objects."""
+    def close_notifiers(cls) -> None:
+        for notifier in cls._notifiers.values():
+            notifier.close()
+
+    @classmethod
+    def setup_memory(cls, config: AppConfig) -> None:
+        """Setup tracemalloc snapshots"""
+        if config.memory.enabled:
+            cls._memory_monitor = MemoryMonitor(
+                interval=config.memory.snapshot_interval,
+                top=config.memory.top,
+                frames=config.memory.frames,
+            )
+            cls._memory_monitor.start()
+
+    @classmethod
+    def setup_profiling(cls, directory: str, every: Optional[int] = None, slow: Optional[float] = None) -> None:
+        """Setup per-cycle profiling"""
+        cls._profiler = CycleProfiler(directory, every=every, slow=slow)
+        logger.info(f"Profiling cycles into {directory}")
+
+    @classmethod
+    def fetch_feed(cls) -> bytes:
+        """Download the raw GTFS-RT alerts feed."""
 
         try:
             logger.info("=" * 100)
             logger.info("Fetching TTC Alerts")
-            response = cls.session.get(cls.alerts_url, timeout=30)
-            response.raise_for_status()
+            with cls.metrics.time("fetch"):
+                response = cls.session.get(cls.alerts_url, timeout=30)
+                response.raise_for_status()
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch alerts: {e}")
             raise NetworkError(f"Network error: {e}")
-        
-        data = response.content
+
+        return response.content
+
+    @classmethod
+    def feed_digest(cls, data: bytes) -> str:
+        """Digest of a feed's entities, ignoring the header that changes on every fetch."""
+
         feed = gtfs_realtime_pb2.FeedMessage()
         feed.ParseFromString(data)
-
-        alerts: list[TTCAlert] = []
+        digest = hashlib.sha256()
         for entity in feed.entity:
-            message = json.loads(MessageToJson(entity))
-            if alert := message.get("alert"):
-                ttc_alert = TTCAlert(**alert)
-                alerts.append(ttc_alert)
+            digest.update(entity.SerializeToString(deterministic=True))
+        return digest.hexdigest()
+
+    @classmethod
+    def parse_alerts(cls, data: bytes) -> list[TTCAlert]:
+        """Parse a GTFS-RT alerts feed into deduplicated TTCAlert objects."""
+
+        return cls.parse_feed(data)[1]
+
+    @classmethod
+    def parse_feed(cls, data: bytes) -> tuple[int, list[TTCAlert]]:
+        """Parse a GTFS-RT alerts feed, returning its header timestamp and deduplicated alerts."""
+
+        with cls.metrics.time("parse"):
+            feed = gtfs_realtime_pb2.FeedMessage()
+            feed.ParseFromString(data)
+
+            alerts: list[TTCAlert] = []
+            for entity in feed.entity:
+                message = json.loads(MessageToJson(entity))
+                if alert := message.get("alert"):
+                    ttc_alert = TTCAlert(**alert)
+                    alerts.append(ttc_alert)
 
         alerts_number = len(alerts)
         logger.info(f"Received {alerts_number} TTC Alerts")
-        alerts = filter_duplicates(alerts, "description")
+        with cls.metrics.time("dedup"):
+            alerts = filter_duplicates(alerts, "description", merge=TTCAlert.merge)
         logger.info(f"Filtered out {alerts_number - len(alerts)} duplicates out of {alerts_number} alerts")
         for alert in alerts:
             logger.info("=" * 60)
             logger.info(alert.format())
 
-        return alerts
+        return feed.header.timestamp, alerts
 
-        #except Exception as e:
-        #    logger.error(f"Failed to parse GTFS-RT data: {e}")
-        #    return []
-    
     @classmethod
-    def monitor_alerts(cls, interval_minutes: int = 1) -> None:
-        """Monitor alerts continuously"""
-
-        def filter_user_alerts(alerts: dict[str, list[TTCAlert]], user_filters: Optional[list[str]] = None) -> dict[str, list[TTCAlert]]:
-            if not user_filters:
-                return alerts
-
-            user_alerts = {
-                "resolved": [],
-                "new": [],
-            }
-            for alert_state in ["resolved", "new"]:
-                for user_filter in user_filters:
-                    for alert in alerts[alert_state]:
-                        if user_filter in str(alert):
-                            user_alerts[alert_state].append(alert)
+    def get_alerts(cls) -> list[TTCAlert]:
+        """Fetch and parse GTFS-RT alerts data, returning a list of TTCAlert objects."""
 
-            return user_alerts
+        with cls._profiler.cycle("get_alerts") if cls._profiler else nullcontext():
+            return cls.parse_alerts(cls.fetch_feed())
 
+    @classmethod
+    def monitor_alerts(
+        cls,
+        interval_minutes: float = 1,
+        max_cycles: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        """
+        Monitor alerts continuously, or for max_cycles polls if given
+
+        Polling, diffing, routing and delivery run as an asyncio pipeline, see
+        MonitorPipeline.
+        """
         logger.info(f"Starting alert monitoring (checking every {interval_minutes} minutes)")
 
-        current_alerts = []
-        
-        while True:
-            try:
-                previous_alerts = current_alerts
-                current_alerts = cls.get_alerts()
-
-                alerts = cls.compare_alerts(previous_alerts, current_alerts)
-                logger.info("*" * 100)
-
-                if alerts["resolved"]:
-                    logger.info(f"RESOLVED:\n\t{"\n\t".join(str(alert) for alert in alerts["resolved"])}")
-                if alerts["unresolved"]:
-                    logger.info(f"UNRESOLVED:\n\t{"\n\t".join(str(alert) for alert in alerts["unresolved"])}")
-                if alerts["new"]:
-                    logger.info(f"NEW:\n\t{"\n\t".join(str(alert) for alert in alerts["new"])}")
-                # Send Telegram notifications if enabled
-                if cls._telegram_controller:
-
-                    for user in cls.config.users:
-                        user_alerts = filter_user_alerts(alerts=alerts, user_filters=user.filters)
-                        if user_alerts["resolved"]:
-                            cls._telegram_controller.notify_alerts("resolved", user_alerts["resolved"], user.chat_id)
-                        if user_alerts["new"]:
-                            cls._telegram_controller.notify_alerts("new", user_alerts["new"], user.chat_id)
-
-
-                logger.info(f"\nNext check in {interval_minutes} minutes...")
-                logger.info("*" * 100)
-                time.sleep(interval_minutes * 60)
-            except KeyboardInterrupt:
-                logger.info("Monitoring stopped by user")
-                break
-            except Exception as e:
-                logger.exception(e)
-                time.sleep(60)
-
-
-    def compare_alerts(previous_alerts: TTCAlert, current_alerts: TTCAlert) -> dict[str, list[TTCAlert]]:
+        pipeline = MonitorPipeline(cls, interval=interval_minutes * 60, max_cycles=max_cycles, workers=workers)
+        try:
+            asyncio.run(pipeline.run())
+        except KeyboardInterrupt:
+            logger.info("Monitoring stopped by user")
+        finally:
+            cls.close_notifiers()
+
+    @staticmethod
+    def compare_alerts(previous_alerts: list[TTCAlert], current_alerts: list[TTCAlert]) -> dict[str, list[TTCAlert]]:
         return {
             "resolved": list(set(previous_alerts) - set(current_alerts)),
             "unresolved": list(set(previous_alerts) & set(current_alerts)),
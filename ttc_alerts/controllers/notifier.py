@@ -0,0 +1,43 @@
+"""
+Notifier interface for alert delivery channels
+"""
+
+from abc import ABC, abstractmethod
+
+from ..models.telegram import TelegramMessage
+
+
+class Notifier(ABC):
+    """
+    Delivery channel for rendered alert messages
+
+    The monitor runs `concurrency` delivery workers per notifier and hands
+    each of them up to `batch_size` queued messages at a time, so channels
+    that can send several messages per request or connection get them
+    together.
+    """
+    name: str = "notifier"
+    concurrency: int = 1
+    batch_size: int = 1
+
+    @abstractmethod
+    def send_message(self, message: TelegramMessage, recipient: str) -> bool:
+        """
+        Send one message
+
+        Args:
+            message: Rendered message
+            recipient: Channel specific recipient (chat id, e-mail address, ...)
+
+        Returns:
+            bool: True if the message was accepted by the channel
+        """
+
+    def send_batch(self, deliveries: list[tuple[str, TelegramMessage]]) -> list[bool]:
+        """
+        Send several messages, returning one result per (recipient, message)
+        """
+        return [self.send_message(message, recipient) for recipient, message in deliveries]
+
+    def close(self) -> None:
+        """Release connections held by the notifier"""
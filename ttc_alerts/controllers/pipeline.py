@@ -0,0 +1,408 @@
+"""
+Asyncio monitor pipeline decoupling feed polling from delivery
+"""
+
+import asyncio
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..models.alert import TTCAlert
+from ..models.config import SnapshotConfig
+from ..models.snapshot import MonitorSnapshot
+from ..models.subscription import ALERT_STATES
+from ..models.telegram import TelegramMessage
+from ..utils.logging import setup_logging
+from .scheduler import DeliveryScheduler
+
+if TYPE_CHECKING:
+    from .fetcher import TTCAlertService
+
+
+logger = setup_logging(__name__)
+
+# Queue marker telling the next stage that no more work will arrive
+_DONE: Any = object()
+
+
+@dataclass
+class Delivery:
+    """A rendered message waiting to be sent to one recipient on one channel"""
+    channel: str
+    chat_id: str
+    message: TelegramMessage
+    detected_at: float
+    deferred: bool = False
+
+
+@dataclass
+class Diff:
+    """Alert changes of one feed, queued to every channel's routing task"""
+    detected_at: float
+    changes: dict[str, list[TTCAlert]]
+    alerts: list[TTCAlert]
+    feed_digest: str
+    # Channels that have not routed the changes yet
+    unrouted: int
+
+
+class MonitorPipeline:
+    """
+    Fetch -> diff -> route -> deliver, connected by bounded queues
+
+    The poller runs on a fixed schedule and never waits for the other
+    stages: the feed queue holds a single snapshot and a newer snapshot
+    replaces one that has not been diffed yet. The diff, routing and delivery
+    stages block on their bounded output queues, so a slow notifier holds
+    back routing instead of piling up messages in memory.
+
+    Every notification channel (Telegram bot, e-mail, webhook) has its own
+    routing task, delivery queue and workers, all fed from the single fetch
+    and diff per cycle, so a channel held back by its rate limit does not
+    delay the others until its change queue fills up. Workers take up to the
+    notifier's batch_size queued messages at once.
+
+    New alerts whose active periods have all ended are left out of the diff,
+    and changes that should not go out yet (quiet hours, alerts not active
+    yet) are held in each channel's DeliveryScheduler. The routing task wakes up when the
+    earliest deferred bucket is due and sends each recipient one summary.
+
+    Shutdown (max_cycles reached, SIGINT or SIGTERM) stops polling and drains
+    every queued item through the remaining stages before run() returns.
+
+    When snapshot.path is configured the alert set and feed digest whose
+    changes every channel has routed (deferred or queued for delivery),
+    and the deferred changes, are saved every snapshot.interval seconds and
+    on shutdown. The first cycle after a restart diffs against the saved set
+    instead of nothing, and the deferred changes are scheduled again.
+
+    Args:
+        service: Service providing fetch/parse/diff and the configured notifiers
+        interval: Seconds between feed polls
+        max_cycles: Stop after this many polls, None to run until stopped
+        workers: Delivery workers per channel, defaults to the notifier's concurrency
+        queue_size: Capacity of the change and delivery queues
+    """
+
+    def __init__(
+        self,
+        service: type["TTCAlertService"],
+        interval: float,
+        max_cycles: Optional[int] = None,
+        workers: Optional[int] = None,
+        queue_size: int = 100,
+    ):
+        self.service = service
+        self.interval = interval
+        self.max_cycles = max_cycles
+        self.workers = workers
+        self.queue_size = queue_size
+        self.current_alerts: list[TTCAlert] = []
+        self.feed_digest: Optional[str] = None
+        self.skipped_feeds = 0
+        self._routed_alerts: list[TTCAlert] = []
+        self._routed_digest: Optional[str] = None
+        self._snapshot_saved_at = 0.0
+        self._snapshot_dirty = False
+        self._schedulers: dict[str, DeliveryScheduler] = {}
+
+    def stop(self) -> None:
+        """Stop polling; queued work is still delivered."""
+
+        logger.info("Stopping alert monitoring, draining in-flight work")
+        self._stopping.set()
+
+    async def run(self) -> None:
+        self._stopping = asyncio.Event()
+        self._feeds: asyncio.Queue[bytes] = asyncio.Queue(maxsize=1)
+        notifiers = self.service._notifiers
+        self._changes: dict[str, asyncio.Queue[Diff]] = {
+            channel: asyncio.Queue(maxsize=self.queue_size) for channel in notifiers
+        }
+        self._deliveries: dict[str, asyncio.Queue[Delivery]] = {
+            channel: asyncio.Queue(maxsize=self.queue_size) for channel in notifiers
+        }
+        self._workers = {
+            channel: self.workers or notifier.concurrency for channel, notifier in notifiers.items()
+        }
+        self._schedulers = {channel: DeliveryScheduler() for channel in notifiers}
+        self._restore_snapshot()
+
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=sum(self._workers.values()) + 2))
+        handled_signals = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+                handled_signals.append(signum)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass
+
+        try:
+            await asyncio.gather(
+                self._poll(),
+                self._diff(),
+                *(self._route(channel) for channel in notifiers),
+                *(self._deliver(channel) for channel, count in self._workers.items() for _ in range(count)),
+            )
+        finally:
+            for signum in handled_signals:
+                loop.remove_signal_handler(signum)
+            self._write_lag_report()
+            self._save_snapshot(force=True)
+
+    def _profile(self, name: str) -> AbstractContextManager[None]:
+        profiler = self.service._profiler
+        return profiler.cycle(name) if profiler else nullcontext()
+
+    @property
+    def _snapshot_config(self) -> Optional[SnapshotConfig]:
+        config = self.service.config
+        return config.snapshot if config and config.snapshot.path else None
+
+    def _restore_snapshot(self) -> None:
+        if not (snapshot_config := self._snapshot_config):
+            return
+        snapshot = MonitorSnapshot.load(snapshot_config.path, max_age=snapshot_config.max_age)
+        if snapshot:
+            self.current_alerts = self._routed_alerts = snapshot.alerts
+            self.feed_digest = self._routed_digest = snapshot.feed_digest
+            self._snapshot_saved_at = time.monotonic()
+            logger.info(f"Restored {len(snapshot.alerts)} alerts from snapshot {snapshot_config.path}")
+            for channel, buckets in snapshot.deferred.items():
+                if channel not in self._schedulers:
+                    logger.warning(f"Dropping deferred alert changes for unknown channel {channel}")
+                    continue
+                self._schedulers[channel].restore(buckets)
+                logger.info(f"Restored {len(self._schedulers[channel])} deferred alert changes for {channel}")
+
+    def _save_snapshot(self, force: bool = False) -> None:
+        snapshot_config = self._snapshot_config
+        if not snapshot_config or not self._snapshot_dirty:
+            return
+        if not force and time.monotonic() - self._snapshot_saved_at < snapshot_config.interval:
+            return
+        try:
+            MonitorSnapshot(
+                alerts=self._routed_alerts,
+                feed_digest=self._routed_digest,
+                deferred={channel: scheduler.pending() for channel, scheduler in self._schedulers.items()},
+            ).save(snapshot_config.path)
+        except OSError as e:
+            logger.error(f"Failed to save snapshot: {e}")
+            return
+        self._snapshot_saved_at = time.monotonic()
+        self._snapshot_dirty = False
+
+    def _write_lag_report(self) -> None:
+        config = self.service.config
+        if config and config.freshness.report_path:
+            try:
+                self.service.freshness.write_report(config.freshness.report_path)
+            except OSError as e:
+                logger.error(f"Failed to write lag report: {e}")
+
+    async def _poll(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_poll = loop.time()
+        cycles = 0
+        try:
+            while not self._stopping.is_set():
+                cycles += 1
+                try:
+                    data = await asyncio.to_thread(self.service.fetch_feed)
+                except Exception as e:
+                    logger.exception(e)
+                else:
+                    self._put_latest(data)
+
+                if self.max_cycles is not None and cycles >= self.max_cycles:
+                    break
+
+                next_poll += self.interval
+                delay = max(0.0, next_poll - loop.time())
+                logger.info(f"\nNext check in {delay / 60:.2f} minutes...")
+                logger.info("*" * 100)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._feeds.put(_DONE)
+
+    def _put_latest(self, data: bytes) -> None:
+        """Queue a feed snapshot, replacing one the diff stage has not picked up."""
+
+        if self._feeds.full():
+            self._feeds.get_nowait()
+            self.skipped_feeds += 1
+            logger.warning("Diff stage is behind, skipping a stale feed snapshot")
+        self._feeds.put_nowait(data)
+
+    async def _diff(self) -> None:
+        service = self.service
+        try:
+            while (data := await self._feeds.get()) is not _DONE:
+                if service._memory_monitor:
+                    service._memory_monitor.tick()
+                try:
+                    digest = service.feed_digest(data)
+                    if digest == self.feed_digest:
+                        logger.info("Feed unchanged since the last diff")
+                        continue
+                    with self._profile("diff"):
+                        feed_timestamp, current_alerts = service.parse_feed(data)
+                        detected_at = time.time()
+                        with service.metrics.time("diff"):
+                            alerts = service.compare_alerts(self.current_alerts, current_alerts)
+                            # New alerts that already ended are never announced, so they stay
+                            # out of the diffed set and disappearing is no resolution either
+                            if expired := {alert for alert in alerts["new"] if alert.is_expired(detected_at)}:
+                                current_alerts = [alert for alert in current_alerts if alert not in expired]
+                                alerts["new"] = [alert for alert in alerts["new"] if alert not in expired]
+                    self.current_alerts = current_alerts
+                    self.feed_digest = digest
+                    service.freshness.observe_feed(
+                        service.alerts_url, feed_timestamp, detected_at, alerts["new"], alerts["resolved"]
+                    )
+                except Exception as e:
+                    logger.exception(e)
+                    continue
+
+                logger.info("*" * 100)
+                if alerts["resolved"]:
+                    logger.info(f"RESOLVED:\n\t{"\n\t".join(str(alert) for alert in alerts["resolved"])}")
+                if alerts["unresolved"]:
+                    logger.info(f"UNRESOLVED:\n\t{"\n\t".join(str(alert) for alert in alerts["unresolved"])}")
+                if alerts["new"]:
+                    logger.info(f"NEW:\n\t{"\n\t".join(str(alert) for alert in alerts["new"])}")
+
+                self._write_lag_report()
+
+                # Routed even without changes, so the snapshot moves on in feed order
+                diff = Diff(detected_at, alerts, current_alerts, digest, unrouted=len(self._changes))
+                for changes in self._changes.values():
+                    await changes.put(diff)
+                if not diff.unrouted:
+                    self._mark_routed(diff)
+        finally:
+            for changes in self._changes.values():
+                await changes.put(_DONE)
+
+    async def _route(self, channel: str) -> None:
+        service = self.service
+        scheduler = self._schedulers[channel]
+        try:
+            while True:
+                next_due = scheduler.next_due()
+                timeout = None if next_due is None else max(0.0, next_due - time.time())
+                try:
+                    change = await asyncio.wait_for(self._changes[channel].get(), timeout)
+                except asyncio.TimeoutError:
+                    change = None
+                if change is _DONE:
+                    break
+                deferred = len(scheduler)
+                released: list[Delivery] = []
+                try:
+                    with self._profile("route"), service.metrics.time("route"):
+                        deliveries = self._route_changes(channel, change.detected_at, change.changes) if change else []
+                        released = self._release_deferred(channel)
+                        deliveries.extend(released)
+                except Exception as e:
+                    logger.exception(e)
+                    deliveries = []
+                for delivery in deliveries:
+                    await self._deliveries[channel].put(delivery)
+
+                # Saved only now, so the snapshot never counts changes that were not routed as seen
+                if released or len(scheduler) != deferred:
+                    self._snapshot_dirty = True
+                if change:
+                    change.unrouted -= 1
+                    if not change.unrouted:
+                        self._mark_routed(change)
+                self._save_snapshot()
+        finally:
+            if (pending := len(scheduler)) and not self._snapshot_config:
+                logger.warning(f"Dropping {pending} deferred alert changes for {channel} on shutdown")
+            for _ in range(self._workers[channel]):
+                await self._deliveries[channel].put(_DONE)
+
+    def _mark_routed(self, diff: Diff) -> None:
+        """Record the alert set of a diff every channel has routed for the snapshot"""
+
+        self._routed_alerts = diff.alerts
+        self._routed_digest = diff.feed_digest
+        self._snapshot_dirty = True
+
+    def _route_changes(self, channel: str, detected_at: float, alerts: dict[str, list[TTCAlert]]) -> list[Delivery]:
+        index = self.service._subscriptions[channel]
+        scheduler = self._schedulers[channel]
+        now = time.time()
+        starts = {alert: start for alert in alerts.get("new", []) if (start := alert.starts_at(now)) is not None}
+        routed = index.route(alerts)
+
+        deliveries = []
+        for chat_id, user_alerts in routed.items():
+            user_alerts = scheduler.submit(index.users[chat_id], user_alerts, detected_at, now, starts)
+            deliveries.extend(
+                Delivery(channel, chat_id, message, detected_at)
+                for state in ALERT_STATES
+                if (message := TelegramMessage.from_alerts(state, user_alerts[state]))
+            )
+        return deliveries
+
+    def _release_deferred(self, channel: str) -> list[Delivery]:
+        return [
+            Delivery(
+                channel,
+                pending.chat_id,
+                TelegramMessage.from_changes(list(pending.new), list(pending.resolved)),
+                pending.detected_at,
+                deferred=True,
+            )
+            for pending in self._schedulers[channel].pop_due(time.time())
+        ]
+
+    async def _next_batch(self, channel: str, size: int) -> tuple[list[Delivery], bool]:
+        """Wait for one delivery and take up to size - 1 more already queued ones.
+
+        Returns the deliveries and whether this worker's stop marker was taken.
+        """
+        queue = self._deliveries[channel]
+        batch = [await queue.get()]
+        while len(batch) < size and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        deliveries = [item for item in batch if item is not _DONE]
+        stops = len(batch) - len(deliveries)
+        # Stop markers come last; hand the ones meant for other workers back
+        for _ in range(stops - 1):
+            queue.put_nowait(_DONE)
+        return deliveries, stops > 0
+
+    async def _deliver(self, channel: str) -> None:
+        service = self.service
+        notifier = service._notifiers[channel]
+        stopped = False
+        while not stopped:
+            deliveries, stopped = await self._next_batch(channel, notifier.batch_size)
+            if not deliveries:
+                continue
+            started = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(
+                    notifier.send_batch, [(delivery.chat_id, delivery.message) for delivery in deliveries]
+                )
+            except Exception as e:
+                logger.exception(e)
+                results = [False] * len(deliveries)
+            service.metrics.record("deliver", time.perf_counter() - started)
+            for delivery, sent in zip(deliveries, results):
+                # Deferred deliveries would skew the lag report with quiet hours
+                if sent and not delivery.deferred:
+                    service.freshness.delivered(delivery.chat_id, delivery.detected_at, group=channel)
@@ -0,0 +1,137 @@
+"""
+Deferred delivery of alert changes during quiet hours
+"""
+
+import heapq
+import itertools
+from typing import Iterable, Mapping, Optional
+
+from ..models.alert import TTCAlert
+from ..models.config import User
+from ..models.pending import PendingNotification
+
+
+class DeliveryScheduler:
+    """
+    Timer heap of per-recipient buckets of deferred alert changes
+
+    Changes for a recipient that fall due at the same time (the end of their
+    quiet hours, or the start of an alert's active period) share a bucket, so
+    only the first one pushes onto the heap: O(log n) per bucket and O(1) per
+    further change. Nothing is scanned per user; pop_due() only pops buckets
+    that are due, and merges the ones for the same recipient into one summary.
+
+    A deferred change cancels out against the opposite change of the same
+    alert: an alert resolved before its deferred "new" went out is dropped
+    together with the resolution.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, tuple[str, float]]] = []
+        self._buckets: dict[tuple[str, float], PendingNotification] = {}
+        self._pending: dict[tuple[str, TTCAlert], tuple[tuple[str, float], str]] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        """Number of deferred alert changes"""
+        return len(self._pending)
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def submit(
+        self,
+        user: User,
+        changes: Mapping[str, list[TTCAlert]],
+        detected_at: float,
+        now: float,
+        starts: Optional[Mapping[TTCAlert, float]] = None,
+    ) -> dict[str, list[TTCAlert]]:
+        """
+        Defer what a user should not get yet
+
+        Args:
+            user: Recipient
+            changes: Alert changes for the user keyed by state ("resolved", "new")
+            detected_at: When the changes were detected
+            now: Current POSIX time
+            starts: Start time of new alerts that are not active yet
+
+        Returns:
+            dict: The changes to deliver now, keyed by state
+        """
+        starts = starts or {}
+        quiet_until = user.quiet.window_end(now) if user.quiet else None
+        if quiet_until is None and not starts and not self._pending:
+            return {"resolved": list(changes.get("resolved", [])), "new": list(changes.get("new", []))}
+
+        immediate: dict[str, list[TTCAlert]] = {"resolved": [], "new": []}
+        for state, opposite in (("resolved", "new"), ("new", "resolved")):
+            for alert in changes.get(state, []):
+                if self._cancel(user.chat_id, alert, opposite):
+                    continue
+                due = quiet_until
+                if (start := starts.get(alert)) is not None:
+                    due = start
+                    if user.quiet and (window_end := user.quiet.window_end(start)) is not None:
+                        due = window_end
+                if due is None:
+                    immediate[state].append(alert)
+                else:
+                    self._defer(user.chat_id, due, state, alert, detected_at)
+        return immediate
+
+    def _defer(self, chat_id: str, due: float, state: str, alert: TTCAlert, detected_at: float) -> None:
+        key = (chat_id, due)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = PendingNotification(chat_id, due, detected_at)
+            heapq.heappush(self._heap, (due, next(self._sequence), key))
+        getattr(bucket, state)[alert] = None
+        self._pending[(chat_id, alert)] = (key, state)
+
+    def _cancel(self, chat_id: str, alert: TTCAlert, state: str) -> bool:
+        """Drop a deferred change of alert in the given state, returning whether there was one"""
+
+        location = self._pending.get((chat_id, alert))
+        if location is None or location[1] != state:
+            return False
+        key, _ = location
+        del self._pending[(chat_id, alert)]
+        del getattr(self._buckets[key], state)[alert]
+        # The emptied bucket stays on the heap and is skipped when popped
+        return True
+
+    def pending(self) -> list[PendingNotification]:
+        """Deferred buckets ordered by due time, for persisting in a snapshot"""
+        return sorted((bucket for bucket in self._buckets.values() if bucket), key=lambda bucket: bucket.due)
+
+    def restore(self, buckets: Iterable[PendingNotification]) -> None:
+        """Defer the changes of buckets saved with pending() again"""
+
+        for bucket in buckets:
+            for state in ("resolved", "new"):
+                for alert in getattr(bucket, state):
+                    self._defer(bucket.chat_id, bucket.due, state, alert, bucket.detected_at)
+
+    def pop_due(self, now: float) -> list[PendingNotification]:
+        """
+        Remove and return the buckets due at `now`, one per recipient
+
+        New alerts that expired while deferred are left out.
+        """
+        due: dict[str, PendingNotification] = {}
+        while self._heap and self._heap[0][0] <= now:
+            _, _, key = heapq.heappop(self._heap)
+            bucket = self._buckets.pop(key, None)
+            if not bucket:
+                continue
+            for state in ("new", "resolved"):
+                for alert in getattr(bucket, state):
+                    self._pending.pop((bucket.chat_id, alert), None)
+
+            merged = due.setdefault(bucket.chat_id, PendingNotification(bucket.chat_id, bucket.due, bucket.detected_at))
+            merged.detected_at = min(merged.detected_at, bucket.detected_at)
+            merged.new.update((alert, None) for alert in bucket.new if not alert.is_expired(now))
+            merged.resolved.update(bucket.resolved)
+        return [notification for notification in due.values() if notification]
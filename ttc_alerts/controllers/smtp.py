@@ -0,0 +1,123 @@
+"""
+E-mail notification controller
+"""
+
+import re
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import Optional
+
+from ..models.config import SmtpConfig
+from ..models.telegram import TelegramMessage
+from ..utils.logging import setup_logging
+from .notifier import Notifier
+
+
+logger = setup_logging(__name__)
+
+
+class SmtpNotifier(Notifier):
+    """
+    Sends alerts by e-mail over one long-lived SMTP connection
+
+    The connection is opened and authenticated once and reused for every
+    message; it is re-established only after the server drops it or closes
+    it with a 421 reply.
+    """
+
+    concurrency = 1
+
+    def __init__(self, config: SmtpConfig):
+        """
+        Initialize SMTP notifier
+
+        Args:
+            config: SMTP channel configuration
+        """
+        self.config = config
+        self.name = config.name
+        self.batch_size = config.batch_size
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            return self._smtp
+
+        smtp_class = smtplib.SMTP_SSL if self.config.ssl else smtplib.SMTP
+        smtp = smtp_class(self.config.host, self.config.port, timeout=self.config.timeout)
+        try:
+            smtp.ehlo()
+            if self.config.starttls and not self.config.ssl:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.config.username:
+                smtp.login(self.config.username, self.config.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        self.connects += 1
+        self._smtp = smtp
+        return smtp
+
+    def _reset(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            finally:
+                self._smtp = None
+
+    def build_email(self, message: TelegramMessage, recipient: str) -> EmailMessage:
+        """Build an HTML e-mail from a rendered alert message"""
+
+        first_line = message.text.split("\n", 1)[0]
+        email = EmailMessage()
+        email["From"] = self.config.sender
+        email["To"] = recipient
+        email["Subject"] = re.sub(r"<[^>]+>", "", first_line).strip() or "TTC service alerts"
+        email.set_content(re.sub(r"<[^>]+>", "", message.text))
+        email.add_alternative(message.text.replace("\n", "<br>\n"), subtype="html")
+        return email
+
+    def _send(self, message: TelegramMessage, recipient: str) -> None:
+        email = self.build_email(message, recipient)
+        try:
+            self._connect().send_message(email)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+            if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421:
+                raise
+            # The server dropped the session, often with a 421 after an idle timeout
+            self._reset()
+            self._connect().send_message(email)
+
+    def send_message(self, message: TelegramMessage, recipient: str) -> bool:
+        return self.send_batch([(recipient, message)])[0]
+
+    def send_batch(self, deliveries: list[tuple[str, TelegramMessage]]) -> list[bool]:
+        """Send every message over the shared connection"""
+
+        results = []
+        with self._lock:
+            for recipient, message in deliveries:
+                try:
+                    self._send(message, recipient)
+                    results.append(True)
+                except smtplib.SMTPRecipientsRefused as e:
+                    logger.error(f"Failed to send e-mail to {recipient}: {e}")
+                    results.append(False)
+                except (smtplib.SMTPException, OSError) as e:
+                    logger.error(f"Failed to send e-mail to {recipient}: {e}")
+                    self._reset()
+                    results.append(False)
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._smtp = None
@@ -3,27 +3,40 @@ Telegram notification controller
 """
 
 import requests
+import time
+from requests.adapters import HTTPAdapter
 from typing import Optional
 from ..models.telegram import TelegramMessage
 from ..models.config import TelegramConfig
+from .notifier import Notifier
 from ..utils.logging import setup_logging
+from ..utils.ratelimit import TokenBucket
 
 
 logger = setup_logging(__name__)
 
 
-class TelegramController:
-    """Controller for sending Telegram notifications"""
+class TelegramController(Notifier):
+    """Controller for sending Telegram notifications from one bot"""
 
     def __init__(self, config: TelegramConfig):
         """
         Initialize Telegram controller
 
+        Every bot gets its own connection pool and rate limit budget.
+
         Args:
-            config: Telegram configuration
+            config: Telegram bot configuration
         """
         self.config = config
-        self.api_url = f"https://api.telegram.org/bot{config.bot_token}/sendMessage"
+        self.name = config.name
+        self.concurrency = config.pool_size
+        self.api_url = f"{config.api_url}/bot{config.bot_token}/sendMessage"
+        self.rate_limiter = TokenBucket(config.rate_limit)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def send_message(self, message: TelegramMessage, chat_id: str) -> bool:
         """
@@ -36,14 +49,23 @@ class TelegramController:
             bool: True if message was sent successfully, False otherwise
         """
         try:
-            response = requests.post(
-                self.api_url,
-                json={
-                    "chat_id": chat_id,
-                    "text": message.text,
-                    "parse_mode": message.parse_mode
-                }
-            )
+            for attempt in range(self.config.max_retries + 1):
+                self.rate_limiter.acquire()
+                response = self.session.post(
+                    self.api_url,
+                    json={
+                        "chat_id": chat_id,
+                        "text": message.text,
+                        "parse_mode": message.parse_mode
+                    },
+                    timeout=30,
+                )
+                if response.status_code != 429 or attempt == self.config.max_retries:
+                    break
+                retry_after = self._retry_after(response)
+                logger.warning(f"Telegram bot {self.config.name} rate limited, retrying in {retry_after} seconds")
+                time.sleep(retry_after)
+
             response.raise_for_status()
             logger.info(response)
             logger.info(response.content)
@@ -52,6 +74,16 @@ class TelegramController:
             logger.error(f"Failed to send Telegram message: {e}")
             return False
 
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return 1.0
+
+    def close(self) -> None:
+        self.session.close()
+
     def notify_alerts(self, alert_type: str, alerts: list, chat_id: str) -> None:
         """
         Send notification about alert changes
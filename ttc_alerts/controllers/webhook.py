@@ -0,0 +1,66 @@
+"""
+Webhook notification controller
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..models.config import WebhookConfig
+from ..models.telegram import TelegramMessage
+from ..utils.logging import setup_logging
+from .notifier import Notifier
+
+
+logger = setup_logging(__name__)
+
+
+class WebhookNotifier(Notifier):
+    """
+    Posts alerts to an HTTP endpoint in batches
+
+    Each request carries up to batch_size messages as
+    {"messages": [{"recipient": ..., "text": ..., "parse_mode": ...}, ...]}
+    and is sent over a pooled keep-alive session.
+    """
+
+    def __init__(self, config: WebhookConfig):
+        """
+        Initialize webhook notifier
+
+        Args:
+            config: Webhook channel configuration
+        """
+        self.config = config
+        self.name = config.name
+        self.concurrency = config.pool_size
+        self.batch_size = config.batch_size
+        self.session = requests.Session()
+        self.session.headers.update(config.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send_message(self, message: TelegramMessage, recipient: str) -> bool:
+        return self.send_batch([(recipient, message)])[0]
+
+    def send_batch(self, deliveries: list[tuple[str, TelegramMessage]]) -> list[bool]:
+        results = []
+        for start in range(0, len(deliveries), self.batch_size):
+            chunk = deliveries[start:start + self.batch_size]
+            payload = {
+                "messages": [
+                    {"recipient": recipient, "text": message.text, "parse_mode": message.parse_mode}
+                    for recipient, message in chunk
+                ]
+            }
+            try:
+                response = self.session.post(self.config.url, json=payload, timeout=self.config.timeout)
+                response.raise_for_status()
+                results.extend([True] * len(chunk))
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Failed to post {len(chunk)} messages to webhook {self.name}: {e}")
+                results.extend([False] * len(chunk))
+        return results
+
+    def close(self) -> None:
+        self.session.close()
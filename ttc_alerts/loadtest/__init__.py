@@ -0,0 +1,20 @@
+"""
+Load testing harness for TTC Alerts
+"""
+
+from .gtfs_server import ChurnScript, FakeGTFSServer
+from .telegram_server import FakeTelegramServer, Receipt
+from .smtp_server import FakeSMTPServer
+from .webhook_server import FakeWebhookServer
+from .harness import LoadTestResult, run_load_test
+
+__all__ = [
+    'ChurnScript',
+    'FakeGTFSServer',
+    'FakeTelegramServer',
+    'Receipt',
+    'FakeSMTPServer',
+    'FakeWebhookServer',
+    'LoadTestResult',
+    'run_load_test',
+]
@@ -0,0 +1,135 @@
+"""
+Local GTFS-RT alerts feed stand-in with scripted churn
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from google.transit import gtfs_realtime_pb2
+
+
+ALERT_ID_FORMAT = "ALERT-{:06d}"
+ALERT_ID_PATTERN = r"ALERT-(\d{6})"
+
+
+@dataclass
+class ChurnScript:
+    """
+    Deterministic sequence of active alert sets
+
+    Every tick resolves `churn` of the active alerts and publishes `churn`
+    brand new ones, so the active set size stays at `active`.
+    """
+    active: int = 50
+    churn: int = 5
+    routes: int = 200
+    seed: int = 0
+    _rng: random.Random = field(init=False, repr=False)
+    _next_id: int = field(init=False, default=0, repr=False)
+    _current: list[int] = field(init=False, default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def advance(self) -> list[int]:
+        """Move to the next tick and return the active alert ids."""
+
+        if not self._current:
+            self._current = [self._new_id() for _ in range(self.active)]
+            return list(self._current)
+
+        resolved = set(self._rng.sample(self._current, min(self.churn, len(self._current))))
+        self._current = [alert_id for alert_id in self._current if alert_id not in resolved]
+        self._current.extend(self._new_id() for _ in range(self.active - len(self._current)))
+        return list(self._current)
+
+    def route_for(self, alert_id: int) -> str:
+        return str(alert_id % self.routes + 1)
+
+
+def build_feed(alert_ids: list[int], script: ChurnScript, timestamp: Optional[int] = None) -> bytes:
+    """Serialize a GTFS-RT FeedMessage containing the given alerts."""
+
+    feed = gtfs_realtime_pb2.FeedMessage()
+    feed.header.gtfs_realtime_version = "2.0"
+    feed.header.timestamp = int(time.time()) if timestamp is None else timestamp
+    for alert_id in alert_ids:
+        route_id = script.route_for(alert_id)
+        entity = feed.entity.add()
+        entity.id = str(alert_id)
+        alert = entity.alert
+        alert.header_text.translation.add(text=f"Route {route_id}", language="en")
+        alert.description_text.translation.add(
+            text=f"Detour in effect [{ALERT_ID_FORMAT.format(alert_id)}] near stop {alert_id}",
+            language="en",
+        )
+        alert.informed_entity.add(route_id=route_id, stop_id=str(alert_id))
+    return feed.SerializeToString()
+
+
+class FakeGTFSServer:
+    """
+    HTTP server serving a GTFS-RT alerts feed from a ChurnScript
+
+    Each GET advances the script by one tick, so the feed changes on every
+    poll. Every served snapshot and the first time each alert was served are
+    recorded for the harness to compute expected notifications and latency.
+    """
+
+    def __init__(self, script: ChurnScript, host: str = "127.0.0.1", port: int = 0):
+        self.script = script
+        self.snapshots: list[list[int]] = []
+        self.published_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/alerts"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = server.next_feed()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-protobuf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def next_feed(self) -> bytes:
+        with self._lock:
+            alert_ids = self.script.advance()
+            now = time.time()
+            for alert_id in alert_ids:
+                self.published_at.setdefault(alert_id, now)
+            self.snapshots.append(alert_ids)
+            return build_feed(alert_ids, self.script, int(now))
+
+    def start(self) -> "FakeGTFSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,204 @@
+"""
+End-to-end load harness driving the real monitor against local stand-ins
+"""
+
+import argparse
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from ..controllers.fetcher import TTCAlertService
+from ..models.config import AppConfig, TelegramConfig, User
+from ..utils.metrics import StageMetrics, percentile
+from .gtfs_server import ChurnScript, FakeGTFSServer
+from .telegram_server import FakeTelegramServer
+
+
+# Class-level TTCAlertService state a run overrides and restores afterwards
+SERVICE_STATE = ("alerts_url", "config", "metrics", "freshness", "_subscriptions", "_notifiers", "_stops")
+
+
+@dataclass
+class LoadTestResult:
+    """Outcome of a single load test run"""
+    users: int
+    bots: int
+    cycles: int
+    polls: int
+    duration: float
+    messages: int
+    deliveries: int
+    expected: int
+    dropped: int
+    duplicates: int
+    rate_limited: int
+    latency: dict[str, float]
+    stages: dict[str, dict[str, float]]
+
+    @property
+    def throughput(self) -> float:
+        """Delivered alert notifications per second"""
+        return self.deliveries / self.duration if self.duration else 0.0
+
+
+def expected_events(snapshots: list[list[int]]) -> set[tuple[str, int]]:
+    """Return the (kind, alert_id) events a subscriber should receive."""
+
+    events: set[tuple[str, int]] = set()
+    previous: set[int] = set()
+    for snapshot in snapshots:
+        current = set(snapshot)
+        events.update(("new", alert_id) for alert_id in current - previous)
+        events.update(("resolved", alert_id) for alert_id in previous - current)
+        previous = current
+    return events
+
+
+def run_load_test(
+    users: int,
+    bots: int = 1,
+    cycles: int = 5,
+    interval: float = 0.5,
+    script: ChurnScript | None = None,
+    telegram: FakeTelegramServer | None = None,
+) -> LoadTestResult:
+    """
+    Run the monitor for a number of cycles and measure what was delivered
+
+    Args:
+        users: Number of unfiltered subscribers per bot
+        bots: Number of bots sharing the monitor
+        cycles: Number of monitor cycles to run
+        interval: Seconds between monitor cycles
+        script: Feed churn script, defaults to ChurnScript()
+        telegram: Telegram stand-in, defaults to one without faults
+    """
+    saved_state = {name: getattr(TTCAlertService, name) for name in SERVICE_STATE}
+    gtfs = FakeGTFSServer(script or ChurnScript()).start()
+    telegram = (telegram or FakeTelegramServer()).start()
+    try:
+        config = AppConfig(bots=[
+            TelegramConfig(
+                name=f"bot{b}",
+                bot_token=f"LOADTEST{b}",
+                api_url=telegram.url,
+                users=[User(username=f"user{i}", chat_id=f"{b}-{i}") for i in range(users)],
+                rate_limit=1_000_000,
+                max_retries=5,
+            )
+            for b in range(bots)
+        ])
+        TTCAlertService.alerts_url = gtfs.url
+        TTCAlertService.metrics = StageMetrics()
+        TTCAlertService.setup_config(config)
+        TTCAlertService.setup_notifiers(config)
+
+        started = time.perf_counter()
+        # monitor_alerts drains every in-flight delivery before it returns
+        TTCAlertService.monitor_alerts(interval_minutes=interval / 60, max_cycles=cycles)
+        duration = time.perf_counter() - started
+        stages = TTCAlertService.metrics.summary()
+    finally:
+        gtfs.stop()
+        telegram.stop()
+        for name, value in saved_state.items():
+            setattr(TTCAlertService, name, value)
+
+    events = expected_events(gtfs.snapshots)
+    expected = {
+        (user.chat_id, kind, alert_id)
+        for bot in config.bots
+        for user in bot.users
+        for kind, alert_id in events
+    }
+    received = Counter((r.chat_id, r.kind, r.alert_id) for r in telegram.receipts)
+    latencies = [
+        r.received_at - gtfs.published_at[r.alert_id]
+        for r in telegram.receipts
+        if r.kind == "new" and r.alert_id in gtfs.published_at
+    ]
+
+    return LoadTestResult(
+        users=users,
+        bots=bots,
+        cycles=cycles,
+        polls=len(gtfs.snapshots),
+        duration=duration,
+        messages=telegram.messages,
+        deliveries=len(telegram.receipts),
+        expected=len(expected),
+        dropped=len(expected - received.keys()),
+        duplicates=sum(count - 1 for count in received.values() if count > 1),
+        rate_limited=telegram.rate_limited,
+        latency={f"p{q}": percentile(latencies, q) for q in (50, 95, 99)},
+        stages=stages,
+    )
+
+
+def format_result(result: LoadTestResult) -> str:
+    """Render a load test result as a human readable report."""
+
+    lines = [
+        f"bots={result.bots} users/bot={result.users} cycles={result.cycles} polls={result.polls}"
+        f" duration={result.duration:.2f}s",
+        f"  messages={result.messages} deliveries={result.deliveries} expected={result.expected}"
+        f" throughput={result.throughput:.1f}/s",
+        f"  dropped={result.dropped} duplicates={result.duplicates} rate_limited={result.rate_limited}",
+        "  end-to-end new alert latency: "
+        + " ".join(f"{name}={value * 1000:.1f}ms" for name, value in result.latency.items()),
+    ]
+    for stage, stats in result.stages.items():
+        values = " ".join(f"{name}={value * 1000:.2f}ms" for name, value in stats.items() if name != "count")
+        lines.append(f"  {stage:<8} n={stats['count']:<6} {values}")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    """Initialize load test parsers."""
+
+    parser = argparse.ArgumentParser(description='TTC Alerts end-to-end load test')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 10, 100], help='Subscriber counts to test')
+    parser.add_argument('--bots', type=int, default=1, help='Bots sharing the fetched feed')
+    parser.add_argument('--cycles', type=int, default=5, help='Monitor cycles per run')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between monitor cycles')
+    parser.add_argument('--active', type=int, default=50, help='Active alerts in the feed')
+    parser.add_argument('--churn', type=int, default=5, help='Alerts replaced on every poll')
+    parser.add_argument('--latency', type=float, default=0.0, help='Telegram API latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Telegram API latency jitter in seconds')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='Fraction of Telegram calls answered with 429')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--verbose', action='store_true', help='Keep monitor logging enabled')
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Main entry point for the load test"""
+
+    args = parse_args()
+
+    if not args.verbose:
+        for name in list(logging.root.manager.loggerDict):
+            if name.startswith("ttc_alerts"):
+                logging.getLogger(name).setLevel(logging.WARNING)
+
+    for users in args.users:
+        result = run_load_test(
+            users=users,
+            bots=args.bots,
+            cycles=args.cycles,
+            interval=args.interval,
+            script=ChurnScript(active=args.active, churn=args.churn, seed=args.seed),
+            telegram=FakeTelegramServer(
+                latency=args.latency,
+                jitter=args.jitter,
+                rate_limit_ratio=args.rate_limit_ratio,
+                seed=args.seed,
+            ),
+        )
+        print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
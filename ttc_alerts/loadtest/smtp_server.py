@@ -0,0 +1,104 @@
+"""
+Local SMTP server stand-in recording delivered e-mails
+"""
+
+import socketserver
+import threading
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import Optional
+
+
+class FakeSMTPServer:
+    """
+    Minimal SMTP server accepting EHLO, AUTH PLAIN, MAIL, RCPT and DATA
+
+    Counts connections, logins and messages so tests can check that a
+    notifier reuses one authenticated session.
+
+    Args:
+        drop_after: Answer MAIL with 421 and close the session after this
+            many messages on one connection, like an idle timeout
+    """
+
+    def __init__(self, drop_after: Optional[int] = None, host: str = "127.0.0.1", port: int = 0):
+        self.drop_after = drop_after
+        self.messages: list[EmailMessage] = []
+        self.connections = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _handler(self) -> type[socketserver.StreamRequestHandler]:
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self) -> None:
+                with server._lock:
+                    server.connections += 1
+                self.reply("220 localhost ESMTP loadtest")
+                received = 0
+                while line := self.rfile.readline():
+                    command = line.decode(errors="replace").strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.reply("250-localhost")
+                        self.reply("250 AUTH PLAIN")
+                    elif verb == "AUTH":
+                        with server._lock:
+                            server.logins += 1
+                        self.reply("235 2.7.0 Authentication successful")
+                    elif verb == "MAIL" and server.drop_after is not None and received >= server.drop_after:
+                        self.reply("421 4.4.2 Idle timeout, closing connection")
+                        return
+                    elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        server.receive(self.read_data())
+                        received += 1
+                        self.reply("250 OK queued")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+            def read_data(self) -> bytes:
+                lines = []
+                while (line := self.rfile.readline()) not in (b".\r\n", b".\n", b""):
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                return b"".join(lines)
+
+        return Handler
+
+    def receive(self, data: bytes) -> None:
+        """Record a message received with DATA"""
+
+        message = message_from_bytes(data, policy=policy.default)
+        with self._lock:
+            self.messages.append(message)
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
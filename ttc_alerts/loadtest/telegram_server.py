@@ -0,0 +1,137 @@
+"""
+Local Telegram Bot API stand-in recording receipts
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from .gtfs_server import ALERT_ID_PATTERN
+
+
+@dataclass(frozen=True)
+class Receipt:
+    """A single alert mention delivered to a chat"""
+    chat_id: str
+    kind: str
+    alert_id: int
+    received_at: float
+
+
+class FakeTelegramServer:
+    """
+    HTTP/1.1 keep-alive server emulating the Bot API sendMessage method
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        jitter: Extra uniformly distributed latency in seconds
+        rate_limit_ratio: Fraction of requests answered with HTTP 429
+        retry_after: retry_after value reported with injected 429s
+        seed: Seed for the latency and 429 injection RNG
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.receipts: list[Receipt] = []
+        self.messages = 0
+        self.rate_limited = 0
+        self.connections = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                status, body = server.handle(self.path, payload)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return Handler
+
+    def handle(self, path: str, payload: dict) -> tuple[int, dict]:
+        """Answer a Bot API call, returning (status, json body)."""
+
+        if not path.endswith("/sendMessage"):
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            limited = self._rng.random() < self.rate_limit_ratio
+        if delay:
+            time.sleep(delay)
+
+        if limited:
+            with self._lock:
+                self.rate_limited += 1
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+
+        text = payload.get("text", "")
+        kind = "resolved" if "RESOLVED" in text else "new"
+        received_at = time.time()
+        chat_id = str(payload.get("chat_id"))
+        with self._lock:
+            self.messages += 1
+            message_id = self.messages
+            self.receipts.extend(
+                Receipt(chat_id, kind, int(alert_id), received_at)
+                for alert_id in re.findall(ALERT_ID_PATTERN, text)
+            )
+        return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": chat_id}}}
+
+    def start(self) -> "FakeTelegramServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
@@ -2,7 +2,9 @@
 Data models for TTC Alerts
 """
 
-from .alert import TTCAlert
+from .alert import EntitySelector, TimeRange, TTCAlert
 from .filter import filter_duplicates
+from .gtfs_static import StopIndex
+from .subscription import SubscriptionIndex
 
-__all__ = ['TTCAlert', 'filter_duplicates']
+__all__ = ['EntitySelector', 'TimeRange', 'TTCAlert', 'filter_duplicates', 'StopIndex', 'SubscriptionIndex']
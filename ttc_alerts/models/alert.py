@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, AliasPath, field_validator
-from typing import Self
+from pydantic import BaseModel, ConfigDict, Field, AliasPath, ValidationInfo, field_validator
+from typing import Optional, Self
+import hashlib
 
 
 BAD_SUFFIXES: list[str] = [
@@ -10,9 +11,37 @@ BAD_SUFFIXES: list[str] = [
 ]
 
 
+class EntitySelector(BaseModel):
+    """GTFS-RT EntitySelector: what an alert applies to"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    agency_id: Optional[str] = Field(default=None, validation_alias="agencyId")
+    route_id: Optional[str] = Field(default=None, validation_alias="routeId")
+    route_type: Optional[int] = Field(default=None, validation_alias="routeType")
+    stop_id: Optional[str] = Field(default=None, validation_alias="stopId")
+
+
+class TimeRange(BaseModel):
+    """GTFS-RT TimeRange in POSIX seconds; a missing bound is open"""
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+    def contains(self, at: float) -> bool:
+        return (self.start is None or self.start <= at) and (self.end is None or at < self.end)
+
+
+# Validation context for alerts that were already normalized, e.g. restored
+# from a monitor snapshot; normalization is not idempotent for every header.
+NORMALIZED_CONTEXT: dict[str, bool] = {"normalized": True}
+
+
 class TTCAlert(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     header: str = Field(validation_alias=AliasPath("headerText", "translation", 0, "text"))
     description: str = Field(validation_alias=AliasPath("descriptionText", "translation", 0, "text"))
+    informed_entity: list[EntitySelector] = Field(default_factory=list, validation_alias="informedEntity")
+    active_period: list[TimeRange] = Field(default_factory=list, validation_alias="activePeriod")
 
     def __hash__(self) -> int:
         return hash((self.header, self.description))
@@ -24,12 +53,16 @@ class TTCAlert(BaseModel):
 
     @field_validator("header")
     @classmethod
-    def normalize_header(cls, v: str) -> str:
+    def normalize_header(cls, v: str, info: ValidationInfo) -> str:
+        if info.context and info.context.get("normalized"):
+            return v
         for bad_suffix in BAD_SUFFIXES:
             v = v.removesuffix(bad_suffix)
         return v
 
     def model_post_init(self, __context) -> None:
+        if __context and __context.get("normalized"):
+            return
         if self.description.startswith(self.header):
             self.header = self.header.split(": ", 1)[0]
             try:
@@ -37,6 +70,58 @@ class TTCAlert(BaseModel):
             except IndexError:
                 pass
 
+    @classmethod
+    def restore(cls, data: dict) -> Self:
+        """Rebuild an alert from model_dump() output without normalizing it again."""
+
+        return cls.model_validate(data, context=NORMALIZED_CONTEXT)
+
+    @property
+    def identity(self) -> str:
+        """Stable identifier of the alert across processes"""
+        return hashlib.sha1(f"{self.header}\n{self.description}".encode()).hexdigest()[:16]
+
+    @property
+    def route_ids(self) -> set[str]:
+        return {entity.route_id for entity in self.informed_entity if entity.route_id}
+
+    @property
+    def stop_ids(self) -> set[str]:
+        return {entity.stop_id for entity in self.informed_entity if entity.stop_id}
+
+    def merge(self, duplicate: 'TTCAlert') -> None:
+        """Take over the informed entities and active periods of a duplicate alert"""
+
+        self.informed_entity.extend(
+            entity for entity in duplicate.informed_entity if entity not in self.informed_entity
+        )
+        if not (self.active_period and duplicate.active_period):
+            # An alert without active periods is always active
+            self.active_period = []
+        else:
+            self.active_period.extend(
+                period for period in duplicate.active_period if period not in self.active_period
+            )
+
+    def is_expired(self, at: float) -> bool:
+        """True when every active period ended before at"""
+        return bool(self.active_period) and all(
+            period.end is not None and period.end <= at for period in self.active_period
+        )
+
+    def starts_at(self, at: float) -> Optional[int]:
+        """
+        When a not yet active alert becomes active
+
+        Returns:
+            Start of the next active period, or None if the alert is active
+            at `at` (alerts without active periods always are) or expired
+        """
+        if not self.active_period or any(period.contains(at) for period in self.active_period):
+            return None
+        upcoming = [period.start for period in self.active_period if period.start is not None and period.start > at]
+        return min(upcoming, default=None)
+
     def format(self) -> str:
         """Format the alert for display."""
 
@@ -2,32 +2,216 @@
 Configuration models for TTC Alerts
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from datetime import datetime, time, timedelta, tzinfo
 from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import yaml
 import os
 from pathlib import Path
 
 
+@dataclass
+class Proximity:
+    """Subscription to stops within radius meters of a coordinate"""
+    lat: float
+    lon: float
+    radius: float = 500
+
+
+@dataclass(frozen=True)
+class QuietHours:
+    """Daily window, e.g. 22:00-07:00, during which a user is not notified"""
+    start: time
+    end: time
+    tz: Optional[tzinfo] = None
+
+    @classmethod
+    def parse(cls, spec: str, timezone: Optional[str] = None) -> 'QuietHours':
+        """
+        Parse "HH:MM-HH:MM"
+
+        Args:
+            spec: Window start and end; a window may span midnight
+            timezone: IANA time zone name, defaults to the local time zone
+        """
+        try:
+            start, end = (time.fromisoformat(part.strip()) for part in spec.split("-"))
+        except ValueError:
+            raise ValueError(f"Invalid quiet hours {spec!r}, expected HH:MM-HH:MM") from None
+        if start == end:
+            raise ValueError(f"Invalid quiet hours {spec!r}, start and end are equal")
+        try:
+            tz = ZoneInfo(timezone) if timezone else None
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown time zone {timezone!r}") from None
+        return cls(start, end, tz)
+
+    def window_end(self, at: float) -> Optional[float]:
+        """Return when the quiet window containing `at` ends, None if `at` is outside it"""
+
+        now = datetime.fromtimestamp(at, self.tz)
+        current = now.time()
+        if self.start < self.end:
+            if not self.start <= current < self.end:
+                return None
+            day = now.date()
+        elif current >= self.start:
+            day = now.date() + timedelta(days=1)
+        elif current < self.end:
+            day = now.date()
+        else:
+            return None
+        return datetime.combine(day, self.end, self.tz).timestamp()
+
+
 @dataclass
 class User:
-    """User notification configuration"""
+    """
+    User notification configuration
+
+    chat_id is the recipient on the user's channel: a Telegram chat id, an
+    e-mail address or a webhook recipient key.
+    """
     username: str
     chat_id: str
     filters: Optional[list[str]] = None
+    routes: Optional[list[str]] = None
+    stops: Optional[list[str]] = None
+    near: Optional[list[Proximity]] = None
+    quiet_hours: Optional[str] = None
+    timezone: Optional[str] = None
+    quiet: Optional[QuietHours] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.near:
+            self.near = [place if isinstance(place, Proximity) else Proximity(**place) for place in self.near]
+        self.quiet = QuietHours.parse(self.quiet_hours, self.timezone) if self.quiet_hours else None
+
+    @property
+    def subscribes_to_all(self) -> bool:
+        """True when the user has no filters and receives every alert"""
+        return not (self.filters or self.routes or self.stops or self.near)
 
 
 @dataclass
 class TelegramConfig:
-    """Telegram notification configuration"""
+    """Telegram bot configuration"""
     bot_token: str
+    api_url: str = "https://api.telegram.org"
+    name: str = "default"
+    users: list[User] = field(default_factory=list)
+    rate_limit: float = 25
+    pool_size: int = 4
+    max_retries: int = 3
+
+
+@dataclass
+class SmtpConfig:
+    """E-mail notification channel configuration"""
+    host: str
+    sender: str
+    port: int = 587
+    username: Optional[str] = None
+    password: Optional[str] = None
+    starttls: bool = True
+    ssl: bool = False
+    name: str = "email"
+    users: list[User] = field(default_factory=list)
+    batch_size: int = 50
+    timeout: float = 30
+
+
+@dataclass
+class WebhookConfig:
+    """Webhook notification channel configuration"""
+    url: str
+    name: str = "webhook"
+    headers: dict[str, str] = field(default_factory=dict)
+    users: list[User] = field(default_factory=list)
+    batch_size: int = 50
+    pool_size: int = 4
+    timeout: float = 30
+
+
+ChannelConfig = TelegramConfig | SmtpConfig | WebhookConfig
+
+
+def _channel_from_dict(cls: type[ChannelConfig], data: dict) -> ChannelConfig:
+    users = [User(**user) for user in data.get('users', [])]
+    return cls(**{**data, 'users': users})
+
+
+def check_unique_names(channels: list[ChannelConfig]) -> list[ChannelConfig]:
+    names = [channel.name for channel in channels]
+    if duplicates := {name for name in names if names.count(name) > 1}:
+        raise ValueError(f"Duplicate channel names: {', '.join(sorted(duplicates))}")
+    return channels
+
+
+@dataclass
+class MemoryConfig:
+    """Memory tracing configuration"""
+    enabled: bool = False
+    snapshot_interval: float = 3600
+    top: int = 10
+    frames: int = 1
+
+
+@dataclass
+class FreshnessConfig:
+    """Alert freshness reporting configuration"""
+    report_path: Optional[str] = None
+    shards: int = 8
+
+
+@dataclass
+class SnapshotConfig:
+    """Warm restart snapshot configuration"""
+    path: Optional[str] = None
+    interval: float = 60
+    max_age: Optional[float] = 86400
+
+
+@dataclass
+class GtfsStaticConfig:
+    """GTFS static feed used for proximity subscriptions"""
+    path: Optional[str] = None
+    cache_path: Optional[str] = None
+    cell_size: float = 250
 
 
 @dataclass
 class AppConfig:
     """Application configuration"""
-    users: list[User]
+    users: list[User] = field(default_factory=list)
     telegram: Optional[TelegramConfig] = None
+    bots: list[TelegramConfig] = field(default_factory=list)
+    email: list[SmtpConfig] = field(default_factory=list)
+    webhooks: list[WebhookConfig] = field(default_factory=list)
+    memory: MemoryConfig = field(default_factory=MemoryConfig)
+    freshness: FreshnessConfig = field(default_factory=FreshnessConfig)
+    snapshot: SnapshotConfig = field(default_factory=SnapshotConfig)
+    gtfs_static: GtfsStaticConfig = field(default_factory=GtfsStaticConfig)
+
+    @property
+    def telegram_bots(self) -> list[TelegramConfig]:
+        """
+        All configured bots
+
+        The legacy top-level `telegram` section is a bot serving the top-level
+        `users` list.
+        """
+        bots = list(self.bots)
+        if self.telegram:
+            bots.insert(0, replace(self.telegram, users=self.telegram.users or self.users))
+
+        return check_unique_names(bots)
+
+    @property
+    def channels(self) -> list[ChannelConfig]:
+        """All notification channels: Telegram bots, e-mail and webhooks"""
+        return check_unique_names([*self.telegram_bots, *self.email, *self.webhooks])
 
     @classmethod
     def load(cls, config_path: Optional[str] = None) -> 'AppConfig':
@@ -61,11 +245,27 @@ class AppConfig:
         with open(config_path, 'r') as f:
             config_data = yaml.safe_load(f)
 
-        users = [User(**user) for user in config_data["users"]]
+        users = [User(**user) for user in config_data.get("users", [])]
         telegram_config = None
         if telegram_data := config_data.get('telegram'):
-            telegram_config = TelegramConfig(
-                bot_token=telegram_data['bot_token'],
-            )
+            telegram_config = _channel_from_dict(TelegramConfig, telegram_data)
+        bots = [_channel_from_dict(TelegramConfig, bot) for bot in config_data.get('bots', [])]
+        email = [_channel_from_dict(SmtpConfig, channel) for channel in config_data.get('email', [])]
+        webhooks = [_channel_from_dict(WebhookConfig, channel) for channel in config_data.get('webhooks', [])]
+
+        memory_config = MemoryConfig(**config_data.get('memory', {}))
+        freshness_config = FreshnessConfig(**config_data.get('freshness', {}))
+        snapshot_config = SnapshotConfig(**config_data.get('snapshot', {}))
+        gtfs_static_config = GtfsStaticConfig(**config_data.get('gtfs_static', {}))
 
-        return cls(users=users, telegram=telegram_config)
+        return cls(
+            users=users,
+            telegram=telegram_config,
+            bots=bots,
+            email=email,
+            webhooks=webhooks,
+            memory=memory_config,
+            freshness=freshness_config,
+            snapshot=snapshot_config,
+            gtfs_static=gtfs_static_config,
+        )
@@ -1,5 +1,5 @@
 import logging
-from typing import TypeVar, cast, Mapping
+from typing import Callable, Optional, TypeVar, cast, Mapping
 from pydantic import BaseModel
 
 
@@ -12,15 +12,27 @@ def get_field_value(item: T, field: str) -> str:
     value = data.get(field, "")
     return str(value)
 
-def filter_duplicates(items: list[T], field: str) -> list[T]:
+def filter_duplicates(items: list[T], field: str, merge: Optional[Callable[[T, T], None]] = None) -> list[T]:
+    """
+    Drop items whose field value is contained in a longer kept item's value
+
+    Args:
+        items: Items to filter
+        field: Field compared between items
+        merge: Called as merge(kept, duplicate) for every dropped duplicate
+    """
     def get_value_length(item: T) -> int:
         return len(get_field_value(item, field))
 
     items_sorted = sorted(items, key=get_value_length, reverse=True)
     result: list[T] = []
     for item in items_sorted:
-        if not any(get_field_value(item, field) in get_field_value(other, field) for other in result):
+        value = get_field_value(item, field)
+        kept = next((other for other in result if value in get_field_value(other, field)), None)
+        if kept is None:
             result.append(item)
         else:
+            if merge:
+                merge(kept, item)
             logger.debug(f"Duplicate has been filtered: {item}")
     return result
@@ -0,0 +1,285 @@
+"""
+GTFS static stops with a precompiled, memory-mapped spatial index
+"""
+
+import csv
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..utils.files import atomic_write
+from ..utils.geo import Grid, haversine
+from ..utils.logging import setup_logging
+
+
+logger = setup_logging(__name__)
+
+CACHE_MAGIC = b"TTCSTOP1"
+CACHE_NAME = "stops.cache"
+SOURCE_FILES = ("stops.txt", "routes.txt", "trips.txt", "stop_times.txt")
+DEFAULT_CELL_SIZE = 250.0
+
+# magic, source fingerprint, ref_lat, cell_size,
+# stops, routes, stop->route refs, grid cells, string table bytes
+_HEADER = struct.Struct("=8s32sdd5I4x")
+
+
+class StopIndex:
+    """
+    Stop coordinates, served routes and a uniform grid over the stops
+
+    The cache file holds fixed-width arrays that are memory-mapped and read in
+    place: stop latitudes and longitudes sorted by grid cell, the cells as
+    (x, y, start, end) ranges into those arrays, and the routes serving each
+    stop in CSR form (per-stop offsets into a flat list of route indices),
+    followed by the stop and route ids. Arrays use native byte order, so the
+    cache is rebuilt rather than shared between machines.
+
+    Routes per stop come from trips.txt and stop_times.txt when present;
+    without them only stops.txt is needed.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap):
+        self._buffer = buffer
+        self._views: list[memoryview] = []
+        try:
+            self._map(memoryview(buffer))
+        except Exception:
+            self._release()
+            raise
+
+    def _map(self, view: memoryview) -> None:
+        self._views.append(view)
+        if len(view) < _HEADER.size:
+            raise ValueError("truncated stop cache")
+        (magic, self.fingerprint, ref_lat, cell_size,
+         n_stops, n_routes, n_refs, n_cells, strings_len) = _HEADER.unpack_from(view)
+        if magic != CACHE_MAGIC:
+            raise ValueError("not a stop cache")
+
+        offset = _HEADER.size
+
+        def take(fmt: str, count: int) -> memoryview:
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            if offset + size > len(view):
+                raise ValueError("truncated stop cache")
+            part = view[offset:offset + size].cast(fmt)
+            self._views.append(part)
+            offset += size
+            return part
+
+        self.lats = take("d", n_stops)
+        self.lons = take("d", n_stops)
+        self._route_offsets = take("I", n_stops + 1)
+        self._route_refs = take("I", n_refs)
+        cells = take("i", n_cells * 4)
+        strings = bytes(view[offset:offset + strings_len]).decode()
+        ids = strings.split("\0") if strings_len else []
+        if len(ids) != n_stops + n_routes:
+            raise ValueError("corrupt stop cache string table")
+
+        self.stop_ids: list[str] = ids[:n_stops]
+        self.route_ids: list[str] = ids[n_stops:]
+        self.grid = Grid(cell_size, ref_lat)
+        self._cells = {
+            (cells[i], cells[i + 1]): (cells[i + 2], cells[i + 3])
+            for i in range(0, len(cells), 4)
+        }
+        self._positions = {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+
+    def __len__(self) -> int:
+        return len(self.stop_ids)
+
+    def stops_near(self, lat: float, lon: float, radius: float) -> list[str]:
+        """Return ids of stops within radius meters of a coordinate"""
+
+        nearby = []
+        for cell in self.grid.cells_within(lat, lon, radius):
+            span = self._cells.get(cell)
+            if span is None:
+                continue
+            for i in range(*span):
+                if haversine(lat, lon, self.lats[i], self.lons[i]) <= radius:
+                    nearby.append(self.stop_ids[i])
+        return nearby
+
+    def routes_at(self, stop_ids: Iterable[str]) -> set[str]:
+        """Return ids of routes serving any of the given stops"""
+
+        routes = set()
+        for stop_id in stop_ids:
+            i = self._positions.get(stop_id)
+            if i is None:
+                continue
+            for ref in self._route_refs[self._route_offsets[i]:self._route_offsets[i + 1]]:
+                routes.add(self.route_ids[ref])
+        return routes
+
+    def close(self) -> None:
+        """Release the memory-mapped cache"""
+
+        self._release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _release(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+    @staticmethod
+    def source_fingerprint(directory: str | Path, cell_size: float = DEFAULT_CELL_SIZE) -> bytes:
+        """Digest of the source files' sizes and modification times"""
+
+        digest = hashlib.sha256(f"{sys.byteorder}:{cell_size}".encode())
+        for name in SOURCE_FILES:
+            path = Path(directory) / name
+            if path.exists():
+                stat = path.stat()
+                digest.update(f"\0{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.digest()
+
+    @classmethod
+    def compile(cls, directory: str | Path, cell_size: float = DEFAULT_CELL_SIZE) -> bytes:
+        """
+        Parse a GTFS static feed into the cache format
+
+        Args:
+            directory: Directory with stops.txt and optionally routes.txt,
+                trips.txt and stop_times.txt
+            cell_size: Grid cell side in meters
+
+        Returns:
+            bytes: Cache file contents
+        """
+        directory = Path(directory)
+        stops = []
+        for row in _read_csv(directory / "stops.txt"):
+            try:
+                stops.append((row["stop_id"], float(row["stop_lat"]), float(row["stop_lon"])))
+            except (KeyError, ValueError):
+                continue
+
+        route_ids: dict[str, None] = {}
+        if (directory / "routes.txt").exists():
+            route_ids.update((row["route_id"], None) for row in _read_csv(directory / "routes.txt"))
+
+        stop_routes: dict[str, set[str]] = defaultdict(set)
+        if (directory / "trips.txt").exists() and (directory / "stop_times.txt").exists():
+            trip_routes = {row["trip_id"]: row["route_id"] for row in _read_csv(directory / "trips.txt")}
+            with open(directory / "stop_times.txt", newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                trip_column, stop_column = header.index("trip_id"), header.index("stop_id")
+                width = max(trip_column, stop_column) + 1
+                for row in reader:
+                    # Blank and truncated rows are skipped, as DictReader does
+                    if len(row) < width:
+                        continue
+                    if route_id := trip_routes.get(row[trip_column]):
+                        stop_routes[row[stop_column]].add(route_id)
+            for routes in stop_routes.values():
+                route_ids.update(dict.fromkeys(routes))
+
+        ref_lat = sum(lat for _, lat, _ in stops) / len(stops) if stops else 0.0
+        grid = Grid(cell_size, ref_lat)
+        stops.sort(key=lambda stop: grid.cell(stop[1], stop[2]))
+
+        cells = array("i")
+        start = 0
+        for cell, members in groupby(stops, key=lambda stop: grid.cell(stop[1], stop[2])):
+            end = start + sum(1 for _ in members)
+            cells.extend((*cell, start, end))
+            start = end
+
+        route_positions = {route_id: i for i, route_id in enumerate(route_ids)}
+        offsets = array("I", [0])
+        refs = array("I")
+        for stop_id, _, _ in stops:
+            refs.extend(sorted(route_positions[route_id] for route_id in stop_routes.get(stop_id, ())))
+            offsets.append(len(refs))
+
+        strings = "\0".join([*(stop_id for stop_id, _, _ in stops), *route_ids]).encode()
+        header = _HEADER.pack(
+            CACHE_MAGIC,
+            cls.source_fingerprint(directory, cell_size),
+            ref_lat,
+            cell_size,
+            len(stops),
+            len(route_ids),
+            len(refs),
+            len(cells) // 4,
+            len(strings),
+        )
+        return b"".join([
+            header,
+            array("d", (lat for _, lat, _ in stops)).tobytes(),
+            array("d", (lon for _, _, lon in stops)).tobytes(),
+            offsets.tobytes(),
+            refs.tobytes(),
+            cells.tobytes(),
+            strings,
+        ])
+
+    @classmethod
+    def open(cls, path: str | Path) -> Optional['StopIndex']:
+        """Memory-map a cache file, returning None if it is missing or invalid"""
+
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            return cls(buffer)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring stop cache {path}: {e}")
+            buffer.close()
+            return None
+
+    @classmethod
+    def load(
+        cls,
+        directory: str | Path,
+        cache_path: Optional[str | Path] = None,
+        cell_size: float = DEFAULT_CELL_SIZE,
+    ) -> 'StopIndex':
+        """
+        Open the stop cache for a GTFS static feed, rebuilding it when stale
+
+        Args:
+            directory: GTFS static feed directory
+            cache_path: Cache file, defaults to stops.cache in directory
+            cell_size: Grid cell side in meters
+
+        Returns:
+            StopIndex: Memory-mapped from the cache, or held in memory if the
+                cache could not be written
+        """
+        path = Path(cache_path) if cache_path else Path(directory) / CACHE_NAME
+        fingerprint = cls.source_fingerprint(directory, cell_size)
+        if (index := cls.open(path)) is not None:
+            if index.fingerprint == fingerprint:
+                return index
+            index.close()
+
+        logger.info(f"Compiling GTFS static stops from {directory} into {path}")
+        data = cls.compile(directory, cell_size)
+        try:
+            atomic_write(path, data)
+        except OSError as e:
+            logger.warning(f"Failed to write stop cache {path}: {e}")
+            return cls(data)
+        return cls.open(path) or cls(data)
+
+
+def _read_csv(path: Path) -> Iterable[dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
@@ -0,0 +1,20 @@
+"""
+Alert changes held back for later delivery
+"""
+
+from dataclasses import dataclass, field
+
+from .alert import TTCAlert
+
+
+@dataclass
+class PendingNotification:
+    """Alert changes held back for one recipient until `due`"""
+    chat_id: str
+    due: float
+    detected_at: float
+    new: dict[TTCAlert, None] = field(default_factory=dict)
+    resolved: dict[TTCAlert, None] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.resolved)
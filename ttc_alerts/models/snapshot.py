@@ -0,0 +1,120 @@
+"""
+Persisted monitor state for warm restarts
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .alert import TTCAlert
+from .pending import PendingNotification
+from ..utils.files import atomic_write
+from ..utils.logging import setup_logging
+
+
+logger = setup_logging(__name__)
+
+SNAPSHOT_VERSION = 2
+
+
+def _dump_alert(alert: TTCAlert) -> dict:
+    return {"id": alert.identity, **alert.model_dump(exclude_defaults=True)}
+
+
+def _load_alert(item: dict) -> TTCAlert:
+    item = dict(item)
+    alert_id = item.pop("id")
+    alert = TTCAlert.restore(item)
+    if alert.identity != alert_id:
+        raise ValueError(f"alert identity mismatch for {alert_id}")
+    return alert
+
+
+@dataclass
+class MonitorSnapshot:
+    """
+    Alerts the monitor last diffed against and the digest of that feed
+
+    `deferred` holds, per channel, the changes that were held back (quiet
+    hours, alerts not active yet) and not delivered yet. The saved alerts
+    already count them as seen, so they are resubmitted on restore instead
+    of being diffed as new again.
+    """
+    alerts: list[TTCAlert] = field(default_factory=list)
+    feed_digest: Optional[str] = None
+    saved_at: float = 0.0
+    deferred: dict[str, list[PendingNotification]] = field(default_factory=dict)
+
+    def save(self, path: str | Path) -> None:
+        """Atomically replace the snapshot file at path"""
+
+        self.saved_at = time.time()
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": self.saved_at,
+            "feed_digest": self.feed_digest,
+            "alerts": [_dump_alert(alert) for alert in self.alerts],
+            "deferred": {
+                channel: [
+                    {
+                        "chat_id": pending.chat_id,
+                        "due": pending.due,
+                        "detected_at": pending.detected_at,
+                        "new": [_dump_alert(alert) for alert in pending.new],
+                        "resolved": [_dump_alert(alert) for alert in pending.resolved],
+                    }
+                    for pending in buckets
+                ]
+                for channel, buckets in self.deferred.items()
+                if buckets
+            },
+        }
+        atomic_write(path, json.dumps(data, separators=(",", ":")).encode())
+
+    @classmethod
+    def load(cls, path: str | Path, max_age: Optional[float] = None) -> Optional['MonitorSnapshot']:
+        """
+        Load a snapshot written by save()
+
+        Args:
+            path: Snapshot file
+            max_age: Ignore snapshots older than this many seconds
+
+        Returns:
+            MonitorSnapshot, or None if the file is missing, stale or unreadable
+        """
+        try:
+            with open(path, "rb") as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                logger.warning(f"Ignoring snapshot {path} with unsupported version {data.get('version')}")
+                return None
+
+            saved_at = float(data["saved_at"])
+            if max_age is not None and time.time() - saved_at > max_age:
+                logger.warning(f"Ignoring snapshot {path} older than {max_age} seconds")
+                return None
+
+            alerts = [_load_alert(item) for item in data["alerts"]]
+            deferred = {
+                channel: [
+                    PendingNotification(
+                        chat_id=str(item["chat_id"]),
+                        due=float(item["due"]),
+                        detected_at=float(item["detected_at"]),
+                        new=dict.fromkeys(_load_alert(alert) for alert in item.get("new", [])),
+                        resolved=dict.fromkeys(_load_alert(alert) for alert in item.get("resolved", [])),
+                    )
+                    for item in buckets
+                ]
+                for channel, buckets in data.get("deferred", {}).items()
+            }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Failed to load snapshot {path}: {e}")
+            return None
+
+        return cls(alerts=alerts, feed_digest=data.get("feed_digest"), saved_at=saved_at, deferred=deferred)
@@ -0,0 +1,115 @@
+"""
+Subscription index routing alerts to users
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from .alert import TTCAlert
+from .config import User
+from .gtfs_static import StopIndex
+from ..utils.logging import setup_logging
+
+
+logger = setup_logging(__name__)
+
+
+ALERT_STATES: tuple[str, ...] = ("resolved", "new")
+
+
+class SubscriptionIndex:
+    """
+    Inverted index from route/stop ids to subscribed users
+
+    Structured subscriptions (User.routes, User.stops) are resolved with one
+    dictionary lookup per informed entity of an alert. Users with legacy
+    substring filters are still matched against str(alert), and users without
+    any filters receive every alert.
+
+    Proximity subscriptions (User.near) are resolved against the GTFS static
+    stop index once, when the user is added: the stops within the radius go
+    into the stop index, and the routes serving them into a separate route
+    index that only matches route-wide entities (those without a stop_id).
+    Matching an alert therefore never touches coordinates.
+    """
+
+    def __init__(self, users: Iterable[User], stops: Optional[StopIndex] = None):
+        self.stops = stops
+        self.users: dict[str, User] = {}
+        self.by_route: dict[str, list[User]] = defaultdict(list)
+        self.by_stop: dict[str, list[User]] = defaultdict(list)
+        self.near_route: dict[str, list[User]] = defaultdict(list)
+        self.substring: list[User] = []
+        self.everyone: set[str] = set()
+
+        for user in users:
+            self.add(user)
+
+    def add(self, user: User) -> None:
+        """Index a user's subscriptions"""
+
+        self.users[user.chat_id] = user
+        if user.subscribes_to_all:
+            self.everyone.add(user.chat_id)
+            return
+        for route_id in user.routes or []:
+            self.by_route[str(route_id)].append(user)
+        for stop_id in user.stops or []:
+            self.by_stop[str(stop_id)].append(user)
+        if user.near:
+            self.add_nearby(user)
+        if user.filters:
+            self.substring.append(user)
+
+    def add_nearby(self, user: User) -> None:
+        """Index the stops and routes near a user's proximity subscriptions"""
+
+        if self.stops is None:
+            logger.warning(f"Ignoring proximity subscriptions of {user.username}: no GTFS static feed configured")
+            return
+        nearby = {
+            stop_id
+            for place in user.near or []
+            for stop_id in self.stops.stops_near(place.lat, place.lon, place.radius)
+        }
+        for stop_id in nearby:
+            self.by_stop[stop_id].append(user)
+        for route_id in self.stops.routes_at(nearby):
+            self.near_route[route_id].append(user)
+
+    def match(self, alert: TTCAlert) -> set[str]:
+        """Return chat ids of users subscribed to an alert"""
+
+        chat_ids = set(self.everyone)
+        for entity in alert.informed_entity:
+            if entity.route_id is not None:
+                chat_ids.update(user.chat_id for user in self.by_route.get(entity.route_id, ()))
+                if entity.stop_id is None:
+                    chat_ids.update(user.chat_id for user in self.near_route.get(entity.route_id, ()))
+            if entity.stop_id is not None:
+                chat_ids.update(user.chat_id for user in self.by_stop.get(entity.stop_id, ()))
+        if self.substring:
+            text = str(alert)
+            chat_ids.update(
+                user.chat_id
+                for user in self.substring
+                if any(user_filter in text for user_filter in user.filters)
+            )
+        return chat_ids
+
+    def route(self, alerts: dict[str, list[TTCAlert]]) -> dict[str, dict[str, list[TTCAlert]]]:
+        """
+        Split alert changes per subscriber
+
+        Args:
+            alerts: Alert changes keyed by state ("resolved", "new", ...)
+
+        Returns:
+            dict: {chat_id: {state: [alerts]}} for users with at least one match
+        """
+        routed: dict[str, dict[str, list[TTCAlert]]] = {}
+        for state in ALERT_STATES:
+            for alert in alerts.get(state, []):
+                for chat_id in self.match(alert):
+                    routed.setdefault(chat_id, {s: [] for s in ALERT_STATES})[state].append(alert)
+        return routed
@@ -3,12 +3,14 @@ Telegram notification models
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Self
 from datetime import datetime
 import jinja2
 import re
 
 from .alert import TTCAlert
+from ..utils.cache import LRUCache
 
 
 MESSAJE_TEMPLATE = """
@@ -56,6 +58,37 @@ MESSAJE_TEMPLATE = """
 🤖 <i>TTC Alert Bot | Stay informed, travel smart</i>
 """
 
+RENDER_CACHE_SIZE = 256
+
+# Many subscribers usually receive the same set of alerts in a cycle, so the
+# rendered text is cached per (new alerts, resolved alerts) and shared between them.
+_rendered: LRUCache[tuple[tuple[TTCAlert, ...], tuple[TTCAlert, ...]], str] = LRUCache(RENDER_CACHE_SIZE)
+
+
+@lru_cache(maxsize=1)
+def get_template() -> jinja2.Template:
+    """Compile the message template once per process."""
+
+    env = jinja2.Environment()
+    env.filters['regex_match'] = lambda text, pattern: bool(re.match(pattern, text))
+    env.filters['strftime'] = lambda dt, fmt: dt.strftime(fmt)
+
+    return env.from_string(MESSAJE_TEMPLATE)
+
+
+def render_alerts(new_alerts: tuple[TTCAlert, ...], resolved_alerts: tuple[TTCAlert, ...]) -> str:
+    """Render alerts with the message template."""
+
+    template_data = {
+        'new_alerts': new_alerts,
+        'resolved_alerts': resolved_alerts,
+        'timestamp': datetime.now()
+    }
+    message = get_template().render(**template_data)
+
+    return re.sub(r'\n\s*\n+', '\n', message).strip()
+
+
 @dataclass
 class TelegramMessage:
     """Telegram message model"""
@@ -73,24 +106,24 @@ class TelegramMessage:
         """
         if not alerts:
             return None
-            
-        # Create template environment
-        env = jinja2.Environment()
-        env.filters['regex_match'] = lambda text, pattern: bool(re.match(pattern, text))
-        env.filters['strftime'] = lambda dt, fmt: dt.strftime(fmt)
-        
-        template = env.from_string(MESSAJE_TEMPLATE)
-        
-        # Prepare template data
-        template_data = {
-            'new_alerts': alerts if alert_type == 'new' else [],
-            'resolved_alerts': alerts if alert_type == 'resolved' else [],
-            'timestamp': datetime.now()
-        }
-        
-        # Render template
-        message = template.render(**template_data)
 
-        message = re.sub(r'\n\s*\n+', '\n', message).strip()
-            
-        return cls(text=message) 
\ No newline at end of file
+        alerts = tuple(alerts)
+        if alert_type == 'new':
+            return cls.from_changes(alerts, ())
+        if alert_type == 'resolved':
+            return cls.from_changes((), alerts)
+        return cls.from_changes((), ())
+
+    @classmethod
+    def from_changes(cls, new_alerts: List[TTCAlert], resolved_alerts: List[TTCAlert]) -> Self:
+        """
+        Create one message listing both new and resolved alerts
+
+        Args:
+            new_alerts: Alerts that appeared
+            resolved_alerts: Alerts that were resolved
+        """
+        key = (tuple(new_alerts), tuple(resolved_alerts))
+        message = _rendered.get_or_create(key, lambda: render_alerts(*key))
+
+        return cls(text=message)
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+End-to-end alert freshness tracking
+"""
+
+import json
+import time
+import zlib
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Hashable, Iterable, Optional
+
+from .files import atomic_write
+from .metrics import DEFAULT_PERCENTILES, percentile
+
+
+class FreshnessTracker:
+    """
+    Measures how stale alerts are by the time subscribers get them
+
+    publish->detect is the time between the feed's FeedHeader.timestamp and
+    the cycle that first saw an alert; detect->deliver is the time between
+    that cycle and the channel acknowledgement for a subscriber. The first
+    is kept per feed, the second per channel and subscriber shard.
+
+    Args:
+        shards: Number of shards subscribers are hashed into
+        max_samples: Samples kept per distribution
+    """
+
+    def __init__(self, shards: int = 8, max_samples: int = 10_000):
+        self.shards = shards
+        self.max_samples = max_samples
+        self.first_seen: dict[Hashable, float] = {}
+        self.feed_timestamps: dict[str, int] = {}
+        self._publish_to_detect: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._detect_to_deliver: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+
+    def shard_for(self, chat_id: str) -> str:
+        return f"shard-{zlib.crc32(str(chat_id).encode()) % self.shards}"
+
+    def observe_feed(
+        self,
+        feed: str,
+        feed_timestamp: int,
+        detected_at: float,
+        new: Iterable[Hashable],
+        resolved: Iterable[Hashable] = (),
+    ) -> None:
+        """Record a diffed feed snapshot."""
+
+        self.feed_timestamps[feed] = feed_timestamp
+        for alert in resolved:
+            self.first_seen.pop(alert, None)
+        for alert in new:
+            if alert in self.first_seen:
+                continue
+            self.first_seen[alert] = detected_at
+            if feed_timestamp:
+                self._publish_to_detect[feed].append(max(0.0, detected_at - feed_timestamp))
+
+    def delivered(
+        self,
+        chat_id: str,
+        detected_at: float,
+        acked_at: Optional[float] = None,
+        group: Optional[str] = None,
+    ) -> None:
+        """Record a delivery acknowledgement for changes detected at detected_at."""
+
+        acked_at = time.time() if acked_at is None else acked_at
+        shard = self.shard_for(chat_id)
+        key = f"{group}/{shard}" if group else shard
+        self._detect_to_deliver[key].append(acked_at - detected_at)
+
+    @staticmethod
+    def _distribution(samples: Iterable[float]) -> dict[str, float]:
+        samples = list(samples)
+        return {"count": len(samples), **{f"p{q}": percentile(samples, q) for q in DEFAULT_PERCENTILES}}
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Return lag distributions keyed by metric and feed or shard."""
+
+        all_deliveries = [lag for samples in self._detect_to_deliver.values() for lag in samples]
+        return {
+            "publish_to_detect": {feed: self._distribution(samples) for feed, samples in self._publish_to_detect.items()},
+            "detect_to_deliver": {
+                "all": self._distribution(all_deliveries),
+                **{shard: self._distribution(samples) for shard, samples in sorted(self._detect_to_deliver.items())},
+            },
+        }
+
+    def write_report(self, path: str | Path) -> None:
+        """Atomically write the summary as JSON for `ttc-alerts --lag-report`."""
+
+        report = {"generated_at": time.time(), **self.summary()}
+        atomic_write(path, json.dumps(report, indent=2).encode())
+
+
+def format_report(report: dict) -> str:
+    """Render a lag report as a table."""
+
+    lines = [f"{'metric':<18} {'key':<40} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}"]
+    for metric in ("publish_to_detect", "detect_to_deliver"):
+        for key, stats in report.get(metric, {}).items():
+            lines.append(
+                f"{metric:<18} {key:<40} {stats['count']:>7} "
+                + " ".join(f"{stats[f'p{q}']:>8.2f}s" for q in DEFAULT_PERCENTILES)
+            )
+    if generated_at := report.get("generated_at"):
+        lines.append(f"generated {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(generated_at))}")
+    return "\n".join(lines)
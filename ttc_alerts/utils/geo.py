@@ -0,0 +1,55 @@
+"""
+Geographic helpers for proximity lookups
+"""
+
+import math
+from typing import Iterator
+
+
+EARTH_RADIUS = 6_371_000.0
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters between two coordinates"""
+
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Grid:
+    """
+    Uniform grid of roughly square cells over an equirectangular projection
+
+    Longitudes are scaled by cos(ref_lat), so cells are cell_size meters on a
+    side around ref_lat, which is accurate enough at city scale. Queries
+    widen their longitude span by the query's own latitude, so no point
+    within the radius is missed; callers filter candidates by distance.
+
+    Args:
+        cell_size: Cell side in meters
+        ref_lat: Latitude the projection is centred on
+    """
+
+    def __init__(self, cell_size: float, ref_lat: float):
+        self.cell_size = cell_size
+        self.ref_lat = ref_lat
+        self._lon_scale = math.cos(math.radians(ref_lat)) * METERS_PER_DEGREE / cell_size
+        self._lat_scale = METERS_PER_DEGREE / cell_size
+
+    def cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lon * self._lon_scale), math.floor(lat * self._lat_scale)
+
+    def cells_within(self, lat: float, lon: float, radius: float) -> Iterator[tuple[int, int]]:
+        """Yield every cell that may hold a point within radius meters"""
+
+        dlat = radius / METERS_PER_DEGREE
+        dlon = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        x0, y0 = self.cell(lat - dlat, lon - dlon)
+        x1, y1 = self.cell(lat + dlat, lon + dlon)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield x, y
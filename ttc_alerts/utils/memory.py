@@ -0,0 +1,80 @@
+"""
+Memory instrumentation for long-running monitors
+"""
+
+import signal
+import time
+import tracemalloc
+from typing import Optional
+
+from .logging import setup_logging
+
+
+logger = setup_logging(__name__)
+
+
+class MemoryMonitor:
+    """
+    Periodic tracemalloc snapshots of the running process
+
+    Only the latest snapshot is kept so the instrumentation itself stays
+    bounded; each new snapshot is compared with it to report growth.
+
+    Args:
+        interval: Minimum number of seconds between snapshots taken by tick()
+        top: Number of allocation sites to report
+        frames: Traceback depth recorded by tracemalloc
+    """
+
+    def __init__(self, interval: float = 3600, top: int = 10, frames: int = 1):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_snapshot_at = 0.0
+
+    def start(self, dump_signal: Optional[int] = getattr(signal, "SIGUSR1", None)) -> None:
+        """Start tracing and dump the top allocation sites on dump_signal."""
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._last_snapshot_at = time.monotonic()
+        if dump_signal is not None:
+            signal.signal(dump_signal, lambda signum, frame: self.report())
+        logger.info(f"Memory tracing enabled (snapshot every {self.interval} seconds)")
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._snapshot = None
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        self._last_snapshot_at = time.monotonic()
+        return snapshot
+
+    def top_stats(self, limit: Optional[int] = None) -> list[str]:
+        """Return the top allocation sites and their growth since the last snapshot."""
+
+        snapshot = self._take_snapshot()
+        if self._snapshot is None:
+            stats = snapshot.statistics("lineno")
+        else:
+            stats = snapshot.compare_to(self._snapshot, "lineno")
+        self._snapshot = snapshot
+        return [str(stat) for stat in stats[:limit or self.top]]
+
+    def report(self) -> None:
+        """Log current traced memory and the top allocation sites."""
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = "\n\t".join(self.top_stats())
+        logger.info(f"Traced memory: current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB\n\t{lines}")
+
+    def tick(self) -> None:
+        """Report if the snapshot interval has elapsed; call once per cycle."""
+
+        if time.monotonic() - self._last_snapshot_at >= self.interval:
+            self.report()
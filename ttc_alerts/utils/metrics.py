@@ -0,0 +1,71 @@
+"""
+Lightweight timing metrics for the alert pipeline
+"""
+
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+
+DEFAULT_PERCENTILES: tuple[int, ...] = (50, 95, 99)
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Return the q-th percentile of values using the nearest-rank method."""
+
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageMetrics:
+    """Collects per-stage durations, keeping at most max_samples per stage."""
+
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self._samples: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._counts: dict[str, int] = defaultdict(int)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record a single duration for a stage."""
+
+        self._samples[stage].append(seconds)
+        self._counts[stage] += 1
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and record it under stage."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def stages(self) -> list[str]:
+        return list(self._samples)
+
+    def count(self, stage: str) -> int:
+        return self._counts.get(stage, 0)
+
+    def percentiles(self, stage: str, qs: Iterable[float] = DEFAULT_PERCENTILES) -> dict[str, float]:
+        """Return percentiles for a stage, e.g. {"p50": ..., "p95": ...}."""
+
+        samples = self._samples.get(stage, ())
+        return {f"p{q:g}": percentile(samples, q) for q in qs}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return count and percentiles for every recorded stage."""
+
+        return {
+            stage: {"count": self.count(stage), **self.percentiles(stage)}
+            for stage in self.stages()
+        }
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._counts.clear()
@@ -0,0 +1,76 @@
+"""
+Per-cycle profiling of the monitor
+"""
+
+import cProfile
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .logging import setup_logging
+
+
+logger = setup_logging(__name__)
+
+
+class CycleProfiler:
+    """
+    Profiles individual cycles with cProfile and dumps selected ones
+
+    A cycle is dumped when it is every Nth cycle of its name, or when it took
+    at least `slow` seconds. Catching slow cycles means every cycle runs under
+    the profiler; with only `every` set, the other cycles run unprofiled.
+
+    Dumps are pstats files named <name>-<timestamp>-<cycle>-<ms>ms.prof,
+    readable by pstats, snakeviz, flameprof or gprof2dot.
+
+    Args:
+        directory: Where profile dumps are written
+        every: Dump every Nth cycle of each name
+        slow: Dump cycles taking at least this many seconds
+    """
+
+    def __init__(self, directory: str | Path, every: Optional[int] = None, slow: Optional[float] = None):
+        if every is None and slow is None:
+            every = 1
+        self.directory = Path(directory)
+        self.every = every
+        self.slow = slow
+        self.cycles: dict[str, int] = defaultdict(int)
+        self.dumps: deque[Path] = deque(maxlen=100)
+
+    @contextmanager
+    def cycle(self, name: str = "cycle") -> Iterator[None]:
+        """Profile the enclosed block as one cycle of `name`."""
+
+        self.cycles[name] += 1
+        number = self.cycles[name]
+        sampled = bool(self.every) and number % self.every == 0
+        if not sampled and self.slow is None:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            if sampled or elapsed >= self.slow:
+                self._dump(profiler, name, number, elapsed)
+
+    def _dump(self, profiler: cProfile.Profile, name: str, number: int, elapsed: float) -> None:
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"{name}-{timestamp}-{number:06d}-{elapsed * 1000:.0f}ms.prof"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Failed to write profile {path}: {e}")
+            return
+        self.dumps.append(path)
+        logger.info(f"Profiled {name} cycle {number} ({elapsed * 1000:.1f} ms): {path}")
@@ -3,11 +3,13 @@ Command-line interface for TTC Alerts
 """
 
 import argparse
+import json
 import sys
 import logging
 
 from ..controllers.fetcher import TTCAlertService
 from ..models.config import AppConfig
+from ..utils.freshness import format_report
 from ..utils.logging import setup_logging
 
 
@@ -20,19 +22,46 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--monitor', action='store_true', help='Monitor alerts continuously')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     parser.add_argument('--config', help='Path to configuration file')
+    parser.add_argument('--trace-memory', type=float, metavar='SECONDS',
+                        help='Log top allocation sites every SECONDS (also on SIGUSR1)')
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help='Persist monitor state to PATH and resume from it on restart')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Write cProfile dumps of get_alerts/monitor cycles to DIR')
+    parser.add_argument('--profile-every', type=int, metavar='N',
+                        help='Profile every Nth cycle (default: every cycle unless --profile-slow is set)')
+    parser.add_argument('--profile-slow', type=float, metavar='SECONDS',
+                        help='Profile cycles slower than SECONDS')
+    parser.add_argument('--lag-report', nargs='?', const='', metavar='PATH',
+                        help='Print p50/p95/p99 alert lag written by a running monitor')
     parser.set_defaults(func=show_alerts)
 
     return parser.parse_args()
 
 
 def show_alerts(args: argparse.Namespace) -> None:
+    if args.lag_report is not None:
+        show_lag_report(args.lag_report or AppConfig.load(args.config).freshness.report_path)
+        return
+
     # Load configuration
     config = AppConfig.load(args.config)
 
 
     TTCAlertService.setup_config(config)
-    # Setup Telegram if configured
-    TTCAlertService.setup_telegram(config)
+    # Setup Telegram, e-mail and webhook notifications if configured
+    TTCAlertService.setup_notifiers(config)
+
+    if args.trace_memory:
+        config.memory.enabled = True
+        config.memory.snapshot_interval = args.trace_memory
+    TTCAlertService.setup_memory(config)
+
+    if args.snapshot:
+        config.snapshot.path = args.snapshot
+
+    if args.profile:
+        TTCAlertService.setup_profiling(args.profile, every=args.profile_every, slow=args.profile_slow)
 
     if args.monitor:
         TTCAlertService.monitor_alerts()
@@ -40,6 +69,15 @@ def show_alerts(args: argparse.Namespace) -> None:
         TTCAlertService.get_alerts()
 
 
+def show_lag_report(path: str | None) -> None:
+    """Print the lag report written by the monitor"""
+
+    if not path:
+        raise ValueError("No lag report path given and freshness.report_path is not configured")
+    with open(path) as f:
+        print(format_report(json.load(f)))
+
+
 def main() -> None:
     """Main entry point for the CLI"""
 
@@ -47,7 +85,6 @@ def main() -> None:
 
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
-    args.func(args)
     try:
         args.func(args)
     except Exception as e: